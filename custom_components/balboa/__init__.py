@@ -1,21 +1,44 @@
 """The Balboa Spa Client integration."""
 from __future__ import annotations
 
+import asyncio
 from datetime import timedelta
 import logging
 import time
 
 from pybalboa import SpaClient
+from pybalboa.utils import cancel_task
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.config_validation import datetime
 from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
 
-from .const import CONF_SYNC_TIME, DEFAULT_SYNC_TIME, DOMAIN
+from .command_buffer import SpaCommandBuffer
+from .const import (
+    CONF_COMMAND_BUFFER,
+    CONF_PROXY_PORT,
+    CONF_SYNC_TIME,
+    DATA_COMMAND_BUFFERS,
+    DATA_PLATFORM_ENTRIES,
+    DATA_SETUP_TASKS,
+    DEFAULT_COMMAND_BUFFER,
+    DEFAULT_PROXY_PORT,
+    DEFAULT_SYNC_TIME,
+    DOMAIN,
+)
+from .profiler import async_profile_spas
+from .proxy import SpaProxy
+from .schedule import async_get_scheduler
+from .snapshot import BalboaSpaClient, async_get_snapshot_store
+from .transition import SpaTransitionTracker
+from .websocket import async_register_websocket_commands, async_update_subscriptions
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,44 +55,158 @@ PLATFORMS = [
 
 KEEP_ALIVE_INTERVAL = timedelta(minutes=1)
 SYNC_TIME_INTERVAL = timedelta(hours=1)
+SETUP_CONNECT_BUDGET = 10
+SETUP_RETRY_MAX_DELAY = 300
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+ATTR_DURATION = "duration"
+SERVICE_PROFILE = "profile"
+SERVICE_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        )
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Balboa Spa Client services and websocket commands."""
+
+    async def profile(call: ServiceCall) -> None:
+        """Profile the update handling of all spas."""
+        spas: list[SpaClient] = list(hass.data.get(DOMAIN, {}).values())
+        await async_profile_spas(hass, spas, call.data[ATTR_DURATION])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, profile, schema=SERVICE_PROFILE_SCHEMA
+    )
+    async_register_websocket_commands(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Balboa Spa from a config entry."""
     host = entry.data[CONF_HOST]
 
-    _LOGGER.debug("Attempting to connect to %s", host)
-    spa = SpaClient(host)
-    if not await spa.connect():
-        _LOGGER.error("Failed to connect to spa at %s", host)
-        raise ConfigEntryNotReady("Unable to connect")
-    if not await spa.async_configuration_loaded():
-        _LOGGER.error("Failed to get spa info at %s", host)
-        raise ConfigEntryNotReady("Unable to configure")
+    proxy: SpaProxy | None = None
+    if proxy_port := entry.options.get(CONF_PROXY_PORT, DEFAULT_PROXY_PORT):
+        proxy = SpaProxy(host, listen_port=proxy_port)
+        try:
+            await proxy.start()
+        except OSError as err:
+            _LOGGER.error("Failed to start proxy on port %s: %s", proxy_port, err)
+            raise ConfigEntryNotReady("Unable to start proxy") from err
+        entry.async_on_unload(proxy.close)
+        spa = BalboaSpaClient("127.0.0.1", proxy.port)
+    else:
+        spa = BalboaSpaClient(host)
+    snapshots = await async_get_snapshot_store(hass)
+    spa.restore(snapshots.get(entry.entry_id))
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = spa
+    async_update_subscriptions(hass, entry.entry_id, spa)
+    entry.async_on_unload(entry.add_update_listener(update_listener))
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if entry.options.get(CONF_COMMAND_BUFFER, DEFAULT_COMMAND_BUFFER):
+        command_buffer = SpaCommandBuffer(hass, spa)
+        hass.data.setdefault(DATA_COMMAND_BUFFERS, {})[entry.entry_id] = command_buffer
+        entry.async_on_unload(command_buffer.async_start())
 
-    await async_setup_time_sync(hass, entry)
-    entry.async_on_unload(entry.add_update_listener(update_listener))
+    if spa.snapshot_complete:
+        # the entities show the snapshot until the spa reports in
+        await async_setup_platforms(hass, entry)
+
+    attach = entry.async_create_background_task(
+        hass, async_attach_spa(hass, entry, spa, proxy), f"{DOMAIN} {host} setup"
+    )
+    hass.data.setdefault(DATA_SETUP_TASKS, {})[entry.entry_id] = attach
+    _, pending = await asyncio.wait({attach}, timeout=SETUP_CONNECT_BUDGET)
+    if pending:
+        _LOGGER.warning(
+            "Spa at %s is not reachable yet, it will be attached once it is", host
+        )
+    elif (err := attach.exception()) is not None:
+        await async_unload_entry(hass, entry)
+        raise ConfigEntryNotReady(f"Failed to set up spa at {host}: {err}") from err
 
     return True
 
 
+async def async_attach_spa(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    spa: BalboaSpaClient,
+    proxy: SpaProxy | None,
+) -> None:
+    """Connect to the spa, retrying until it is reachable, and attach it.
+
+    The entities of a spa without a snapshot are set up once it is connected.
+    """
+    host = entry.data[CONF_HOST]
+    attempt = 0
+    while not await async_connect_spa(spa, proxy):
+        delay = min(2**attempt, SETUP_RETRY_MAX_DELAY)
+        _LOGGER.debug("Failed to set up spa at %s, retrying in %ss", host, delay)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+    _LOGGER.debug("Connected to spa at %s", host)
+    hass.data[DATA_SETUP_TASKS].pop(entry.entry_id, None)
+    if entry.entry_id not in hass.data.get(DATA_PLATFORM_ENTRIES, set()):
+        await async_setup_platforms(hass, entry)
+    snapshots = await async_get_snapshot_store(hass)
+    entry.async_on_unload(snapshots.async_track(entry.entry_id, spa))
+    entry.async_on_unload(SpaTransitionTracker(hass, spa).async_start())
+    await async_setup_time_sync(hass, entry)
+
+
+async def async_setup_platforms(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Set up the entities of a spa."""
+    hass.data.setdefault(DATA_PLATFORM_ENTRIES, set()).add(entry.entry_id)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+
+async def async_connect_spa(spa: SpaClient, proxy: SpaProxy | None) -> bool:
+    """Connect to the spa and wait for its configuration."""
+    if spa.configuration_loaded:
+        return True
+    if proxy is not None and not await proxy.async_connected():
+        return False
+    return await spa.connect() and await spa.async_configuration_loaded()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Disconnecting from spa")
     spa: SpaClient = hass.data[DOMAIN][entry.entry_id]
 
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+    if attach := hass.data[DATA_SETUP_TASKS].pop(entry.entry_id, None):
+        await cancel_task(attach)
+    unload_ok = True
+    platform_entries: set[str] = hass.data.get(DATA_PLATFORM_ENTRIES, set())
+    if entry.entry_id in platform_entries:
+        unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        platform_entries.discard(entry.entry_id)
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_update_subscriptions(hass, entry.entry_id, None)
+        hass.data.get(DATA_COMMAND_BUFFERS, {}).pop(entry.entry_id, None)
 
     await spa.disconnect()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the schedule and snapshot of a removed config entry."""
+    scheduler = await async_get_scheduler(hass)
+    scheduler.async_remove(entry.entry_id)
+    snapshots = await async_get_snapshot_store(hass)
+    snapshots.async_remove(entry.entry_id)
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -1,13 +1,16 @@
 """Support for Balboa Spa Wifi adaptor."""
 from __future__ import annotations
 
+from functools import partial
 import math
 from typing import Any
 
 from pybalboa import SpaClient
 from pybalboa.enums import HeatMode, HeatState, TemperatureUnit
+import voluptuous as vol
 
 from homeassistant.components.climate import (
+    ATTR_PRESET_MODE,
     ClimateEntity,
     ClimateEntityFeature,
     HVACAction,
@@ -18,13 +21,17 @@ from homeassistant.const import (
     ATTR_TEMPERATURE,
     PRECISION_HALVES,
     PRECISION_WHOLE,
+    WEEKDAYS,
     UnitOfTemperature,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util.unit_conversion import TemperatureConverter
 
 from .const import DOMAIN
 from .entity import BalboaEntity
+from .schedule import BalboaScheduler, ScheduleRule, async_get_scheduler
 
 CLIMATE_SUPPORTED_MODES = [HVACMode.HEAT, HVACMode.OFF]
 HEAT_HVAC_MODE_MAP = {
@@ -49,6 +56,25 @@ TEMPERATURE_UNIT_MAP = {
     TemperatureUnit.FAHRENHEIT: UnitOfTemperature.FAHRENHEIT,
 }
 
+ATTR_RULES = "rules"
+ATTR_TIME = "time"
+ATTR_WEEKDAYS = "weekdays"
+SERVICE_CLEAR_SCHEDULE = "clear_schedule"
+SERVICE_SET_SCHEDULE = "set_schedule"
+SCHEDULE_RULE_SCHEMA = vol.All(
+    {
+        vol.Optional(ATTR_WEEKDAYS, default=WEEKDAYS): vol.All(
+            cv.ensure_list, [vol.In(WEEKDAYS)]
+        ),
+        vol.Required(ATTR_TIME): cv.time,
+        vol.Optional(ATTR_PRESET_MODE): vol.In(
+            [HEAT_MODE_NAME_MAP[HeatMode.READY], HEAT_MODE_NAME_MAP[HeatMode.REST]]
+        ),
+        vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+    },
+    cv.has_at_least_one_key(ATTR_PRESET_MODE, ATTR_TEMPERATURE),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -57,6 +83,16 @@ async def async_setup_entry(
     spa: SpaClient = hass.data[DOMAIN][entry.entry_id]
     async_add_entities([BalboaClimateEntity(spa)])
 
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_SET_SCHEDULE,
+        {vol.Required(ATTR_RULES): vol.All(cv.ensure_list, [SCHEDULE_RULE_SCHEMA])},
+        "async_set_schedule",
+    )
+    platform.async_register_entity_service(
+        SERVICE_CLEAR_SCHEDULE, {}, "async_clear_schedule"
+    )
+
 
 class BalboaClimateEntity(BalboaEntity, ClimateEntity):
     """Representation of a Balboa spa climate device."""
@@ -66,6 +102,19 @@ class BalboaClimateEntity(BalboaEntity, ClimateEntity):
         ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.PRESET_MODE
     )
 
+    _scheduler: BalboaScheduler
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        await super().async_added_to_hass()
+        assert self.platform.config_entry
+        self._scheduler = await async_get_scheduler(self.hass)
+        self.async_on_remove(
+            self._scheduler.async_attach(
+                self.platform.config_entry.entry_id, self.async_apply_schedule_rule
+            )
+        )
+
     @property
     def precision(self) -> float:
         """Return the precision of the system."""
@@ -136,12 +185,54 @@ class BalboaClimateEntity(BalboaEntity, ClimateEntity):
                 temperature = 0.5 * round(temperature / 0.5)
             else:
                 temperature = math.floor(temperature + 0.5)
-        await self._client.set_temperature(temperature)
+        await self._async_send_command(
+            ATTR_TEMPERATURE, partial(self._client.set_temperature, temperature)
+        )
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set new preset mode."""
-        await self._client.heat_mode.set_state(NAME_HEAT_MODE_MAP[preset_mode])
+        await self._async_set_heat_mode(NAME_HEAT_MODE_MAP[preset_mode])
 
     async def async_set_hvac_mode(self, hvac_mode: str) -> None:
         """Set new target hvac mode."""
-        await self._client.heat_mode.set_state(HVAC_HEAT_MODE_MAP[hvac_mode])
+        await self._async_set_heat_mode(HVAC_HEAT_MODE_MAP[hvac_mode])
+
+    async def _async_set_heat_mode(self, heat_mode: HeatMode) -> None:
+        """Set the heat mode, buffering it while offline if enabled."""
+        control = self._client.heat_mode
+        await self._async_send_command(
+            control.name, partial(control.set_state, heat_mode)
+        )
+
+    async def async_set_schedule(self, rules: list[dict[str, Any]]) -> None:
+        """Set the weekly heat mode and temperature schedule."""
+        assert self.platform.config_entry
+        self._scheduler.async_set_rules(
+            self.platform.config_entry.entry_id,
+            [
+                ScheduleRule(
+                    tuple(WEEKDAYS.index(day) for day in rule[ATTR_WEEKDAYS]),
+                    rule[ATTR_TIME],
+                    rule.get(ATTR_PRESET_MODE),
+                    rule.get(ATTR_TEMPERATURE),
+                )
+                for rule in rules
+            ],
+        )
+
+    async def async_clear_schedule(self) -> None:
+        """Clear the weekly heat mode and temperature schedule."""
+        assert self.platform.config_entry
+        self._scheduler.async_set_rules(self.platform.config_entry.entry_id, [])
+
+    async def async_apply_schedule_rule(self, rule: ScheduleRule) -> None:
+        """Apply a scheduled heat mode and/or target temperature."""
+        if rule.preset_mode is not None:
+            await self.async_set_preset_mode(rule.preset_mode)
+        if rule.temperature is not None:
+            temperature = TemperatureConverter.convert(
+                rule.temperature,
+                self.hass.config.units.temperature_unit,
+                self.temperature_unit,
+            )
+            await self.async_set_temperature(**{ATTR_TEMPERATURE: temperature})
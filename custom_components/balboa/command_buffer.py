@@ -0,0 +1,94 @@
+"""Buffer for commands sent to a Balboa spa while it is disconnected."""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from pybalboa import EVENT_UPDATE, SpaClient
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 32
+DEFAULT_TTL = timedelta(minutes=15)
+
+
+class SpaCommandBuffer:
+    """Hold the commands sent to a spa while it is disconnected.
+
+    Only the last command per key, usually a control, is kept, so replaying the
+    buffer sets each control straight to its final desired state. Commands are
+    replayed back to back once the spa reports in again after reconnecting.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        spa: SpaClient,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: timedelta = DEFAULT_TTL,
+    ) -> None:
+        """Initialize the command buffer."""
+        self.hass = hass
+        self._spa = spa
+        self._max_size = max_size
+        self._ttl = ttl
+        self._commands: dict[str, tuple[datetime, Callable[[], Awaitable[Any]]]] = {}
+        self._buffered_at: datetime | None = None
+        self._replaying = False
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start replaying buffered commands when the spa is back."""
+        return self._spa.on(EVENT_UPDATE, self._async_check_connection)
+
+    async def async_send(self, key: str, command: Callable[[], Awaitable[Any]]) -> None:
+        """Send a command, or buffer it if the spa is disconnected."""
+        if self._spa.connected and not self._commands:
+            await command()
+            return
+
+        self._buffered_at = dt_util.utcnow()
+        self._commands.pop(key, None)
+        self._commands[key] = (self._buffered_at, command)
+        while len(self._commands) > self._max_size:
+            del self._commands[next(iter(self._commands))]
+        _LOGGER.debug("%s -- buffered command for %s", self._spa.host, key)
+
+    @callback
+    def _async_check_connection(self) -> None:
+        """Replay buffered commands once the spa sends messages again."""
+        if (
+            not self._commands
+            or self._replaying
+            or not self._spa.connected
+            or (received := self._spa.last_message_received) is None
+            or received <= self._buffered_at
+        ):
+            return
+        self._replaying = True
+        self.hass.async_create_task(self._async_replay())
+
+    async def _async_replay(self) -> None:
+        """Send the buffered commands that have not expired."""
+        try:
+            cutoff = dt_util.utcnow() - self._ttl
+            commands = [
+                (key, command)
+                for key, (buffered_at, command) in self._commands.items()
+                if buffered_at >= cutoff
+            ]
+            if expired := len(self._commands) - len(commands):
+                _LOGGER.debug(
+                    "%s -- dropped %s expired commands", self._spa.host, expired
+                )
+            self._commands.clear()
+            for key, command in commands:
+                _LOGGER.debug("%s -- replaying command for %s", self._spa.host, key)
+                await command()
+        finally:
+            self._replaying = False
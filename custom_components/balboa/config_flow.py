@@ -1,6 +1,7 @@
 """Config flow for Balboa Spa Client integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
@@ -11,22 +12,74 @@ import voluptuous as vol
 from homeassistant import config_entries, exceptions
 from homeassistant.components.dhcp import DhcpServiceInfo
 from homeassistant.const import CONF_HOST
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.device_registry import format_mac
 
-from .const import CONF_SYNC_TIME, DOMAIN
+from .const import (
+    CONF_COMMAND_BUFFER,
+    CONF_DIAGNOSTIC_WRITE_INTERVAL,
+    CONF_PROXY_PORT,
+    CONF_SYNC_TIME,
+    DATA_PROBES,
+    DEFAULT_COMMAND_BUFFER,
+    DEFAULT_PROXY_PORT,
+    DEFAULT_WRITE_INTERVAL,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 DATA_SCHEMA = vol.Schema({vol.Required(CONF_HOST): str})
-
-
-async def validate_input(data: dict[str, Any]) -> dict[str, str]:
-    """Validate the user input allows us to connect."""
-    _LOGGER.debug("Attempting to connect to %s", data[CONF_HOST])
+PROBE_CACHE_TTL = 30
+
+
+async def validate_input(
+    hass: HomeAssistant, data: dict[str, Any], mac: str | None = None
+) -> dict[str, str]:
+    """Validate the user input allows us to connect.
+
+    Probes are shared by host and MAC address while in flight and their result
+    is reused for a short while, since the spa module only serves a couple of
+    clients at a time.
+    """
+    host = data[CONF_HOST]
+    probes: dict[str, asyncio.Task[dict[str, str]]] = hass.data.setdefault(
+        DATA_PROBES, {}
+    )
+    keys = [host] if mac is None else [host, format_mac(mac)]
+    if (probe := next((probes[key] for key in keys if key in probes), None)) is None:
+        probe = hass.async_create_task(probe_spa(host))
+        for key in keys:
+            probes[key] = probe
+
+        @callback
+        def _cache(_: asyncio.Task) -> None:
+            if not probe.cancelled() and probe.exception() is None:
+                keys.append(probe.result()["formatted_mac"])
+                for key in keys:
+                    probes.setdefault(key, probe)
+
+            @callback
+            def _expire() -> None:
+                for key in keys:
+                    if probes.get(key) is probe:
+                        del probes[key]
+
+            hass.loop.call_later(PROBE_CACHE_TTL, _expire)
+
+        probe.add_done_callback(_cache)
+    else:
+        _LOGGER.debug("Reusing probe of %s", host)
+
+    return await asyncio.shield(probe)
+
+
+async def probe_spa(host: str) -> dict[str, str]:
+    """Connect to the spa and return its model and MAC address."""
+    _LOGGER.debug("Attempting to connect to %s", host)
     try:
-        async with SpaClient(data[CONF_HOST]) as spa:
+        async with SpaClient(host) as spa:
             if not await spa.async_configuration_loaded():
                 raise CannotConnect
             mac = format_mac(spa.mac_address)
@@ -43,7 +96,8 @@ class BalboaSpaClientFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_PUSH
 
-    _host: str | None
+    _host: str | None = None
+    _mac: str | None = None
 
     @staticmethod
     @callback
@@ -57,6 +111,7 @@ class BalboaSpaClientFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         await self.async_set_unique_id(format_mac(discovery_info.macaddress))
         self._abort_if_unique_id_configured(updates={CONF_HOST: discovery_info.ip})
         self._host = discovery_info.ip
+        self._mac = discovery_info.macaddress
         return await self.async_step_confirm()
 
     async def async_step_confirm(
@@ -79,7 +134,8 @@ class BalboaSpaClientFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             self._async_abort_entries_match({CONF_HOST: user_input[CONF_HOST]})
             try:
-                info = await validate_input(user_input)
+                mac = self._mac if user_input[CONF_HOST] == self._host else None
+                info = await validate_input(self.hass, user_input, mac)
                 _LOGGER.debug("Balboa validated input: %s", user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
@@ -122,6 +178,24 @@ class BalboaSpaClientOptionsFlowHandler(config_entries.OptionsFlow):
                         CONF_SYNC_TIME,
                         default=self.config_entry.options.get(CONF_SYNC_TIME, False),
                     ): bool,
+                    vol.Optional(
+                        CONF_PROXY_PORT,
+                        default=self.config_entry.options.get(
+                            CONF_PROXY_PORT, DEFAULT_PROXY_PORT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
+                    vol.Optional(
+                        CONF_DIAGNOSTIC_WRITE_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_DIAGNOSTIC_WRITE_INTERVAL, DEFAULT_WRITE_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_COMMAND_BUFFER,
+                        default=self.config_entry.options.get(
+                            CONF_COMMAND_BUFFER, DEFAULT_COMMAND_BUFFER
+                        ),
+                    ): bool,
                 }
             ),
         )
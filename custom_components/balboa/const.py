@@ -1,4 +1,18 @@
 """Constants for the Balboa Spa Client integration."""
 DOMAIN = "balboa"
+DATA_COMMAND_BUFFERS = f"{DOMAIN}_command_buffers"
+DATA_PLATFORM_ENTRIES = f"{DOMAIN}_platform_entries"
+DATA_PROBES = f"{DOMAIN}_probes"
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DATA_SETUP_TASKS = f"{DOMAIN}_setup_tasks"
+DATA_SNAPSHOTS = f"{DOMAIN}_snapshots"
+DATA_SUBSCRIPTIONS = f"{DOMAIN}_subscriptions"
+EVENT_TRANSITION = f"{DOMAIN}_transition"
 CONF_SYNC_TIME = "sync_time"
 DEFAULT_SYNC_TIME = False
+CONF_PROXY_PORT = "proxy_port"
+DEFAULT_PROXY_PORT = 0
+CONF_DIAGNOSTIC_WRITE_INTERVAL = "diagnostic_write_interval"
+DEFAULT_WRITE_INTERVAL = 0
+CONF_COMMAND_BUFFER = "command_buffer"
+DEFAULT_COMMAND_BUFFER = False
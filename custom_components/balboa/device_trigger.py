@@ -0,0 +1,74 @@
+"""Provides device triggers for Balboa spas."""
+from __future__ import annotations
+
+from pybalboa import SpaClient
+import voluptuous as vol
+
+from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
+from homeassistant.components.homeassistant.triggers import event as event_trigger
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    CONF_DOMAIN,
+    CONF_PLATFORM,
+    CONF_TYPE,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+from homeassistant.helpers.typing import ConfigType
+
+from .const import DOMAIN, EVENT_TRANSITION
+from .transition import CONF_SUBTYPE, get_transitions
+
+TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
+    {vol.Required(CONF_TYPE): str, vol.Optional(CONF_SUBTYPE): str}
+)
+
+
+def _get_spa(hass: HomeAssistant, device_id: str) -> SpaClient | None:
+    """Return the loaded spa of a device."""
+    if device := dr.async_get(hass).async_get(device_id):
+        spas: dict[str, SpaClient] = hass.data.get(DOMAIN, {})
+        for entry_id in device.config_entries:
+            if (spa := spas.get(entry_id)) and spa.configuration_loaded:
+                return spa
+    return None
+
+
+async def async_get_triggers(
+    hass: HomeAssistant, device_id: str
+) -> list[dict[str, str]]:
+    """List the device triggers of a spa."""
+    if (spa := _get_spa(hass, device_id)) is None:
+        return []
+    return [
+        {
+            CONF_PLATFORM: "device",
+            CONF_DEVICE_ID: device_id,
+            CONF_DOMAIN: DOMAIN,
+            **transition,
+        }
+        for transition in get_transitions(spa)
+    ]
+
+
+async def async_attach_trigger(
+    hass: HomeAssistant,
+    config: ConfigType,
+    action: TriggerActionType,
+    trigger_info: TriggerInfo,
+) -> CALLBACK_TYPE:
+    """Attach a trigger to the spa's transition events."""
+    event_data = {CONF_DEVICE_ID: config[CONF_DEVICE_ID], CONF_TYPE: config[CONF_TYPE]}
+    if CONF_SUBTYPE in config:
+        event_data[CONF_SUBTYPE] = config[CONF_SUBTYPE]
+    event_config = event_trigger.TRIGGER_SCHEMA(
+        {
+            event_trigger.CONF_PLATFORM: "event",
+            event_trigger.CONF_EVENT_TYPE: EVENT_TRANSITION,
+            event_trigger.CONF_EVENT_DATA: event_data,
+        }
+    )
+    return await event_trigger.async_attach_trigger(
+        hass, event_config, action, trigger_info, platform_type="device"
+    )
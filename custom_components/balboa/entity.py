@@ -1,44 +1,141 @@
 """Balboa entities."""
 from __future__ import annotations
 
-from datetime import timedelta
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from functools import partial
+from time import monotonic
+from typing import Any
+from weakref import WeakKeyDictionary
 
 from pybalboa import EVENT_UPDATE, SpaClient, SpaControl
 
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC
-from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.entity import DeviceInfo, Entity, EntityCategory
+from homeassistant.helpers.event import async_call_later
 
-from .const import DOMAIN
+from .command_buffer import SpaCommandBuffer
+from .const import (
+    CONF_DIAGNOSTIC_WRITE_INTERVAL,
+    DATA_COMMAND_BUFFERS,
+    DEFAULT_WRITE_INTERVAL,
+    DOMAIN,
+)
 
 TWO_MINUTES = timedelta(minutes=2)
+WRITE_INTERVAL_OPTIONS = {EntityCategory.DIAGNOSTIC: CONF_DIAGNOSTIC_WRITE_INTERVAL}
+
+_DEVICE_METADATA: WeakKeyDictionary[
+    SpaClient, tuple[str, DeviceInfo]
+] = WeakKeyDictionary()
+
+
+def get_device_metadata(client: SpaClient) -> tuple[str, DeviceInfo]:
+    """Return the unique id prefix and device info shared by a spa's entities."""
+    if (metadata := _DEVICE_METADATA.get(client)) is None:
+        mac = client.mac_address
+        model = client.model
+        metadata = _DEVICE_METADATA[client] = (
+            f"{mac}-{model}",
+            DeviceInfo(
+                identifiers={(DOMAIN, mac)},
+                name=model,
+                manufacturer="Balboa Water Group",
+                model=model,
+                sw_version=client.software_version,
+                connections={(CONNECTION_NETWORK_MAC, mac)},
+            ),
+        )
+    return metadata
 
 
 class BalboaBaseEntity(Entity):
     """Balboa base entity."""
 
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+
+    _write_interval: float = 0
+    _last_write: float = 0
+    _unsub_write: CALLBACK_TYPE | None = None
+    _command_buffer: SpaCommandBuffer | None = None
+
     def __init__(self, client: SpaClient, name: str | None = None) -> None:
         """Initialize the control."""
-        mac = client.mac_address
-        model = client.model
+        unique_id_prefix, device_info = get_device_metadata(client)
 
-        self._attr_should_poll = False
-        self._attr_unique_id = f"{mac}-{model}{'' if name is None else f'-{name}'}"
-        self._attr_name = name
-        self._attr_has_entity_name = True
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, mac)},
-            name=model,
-            manufacturer="Balboa Water Group",
-            model=model,
-            sw_version=client.software_version,
-            connections={(CONNECTION_NETWORK_MAC, mac)},
+        self._attr_unique_id = (
+            unique_id_prefix if name is None else f"{unique_id_prefix}-{name}"
         )
+        self._attr_name = name
+        self._attr_device_info = device_info
         self._client = client
 
     @property
     def assumed_state(self) -> bool:
         """Return whether the state is based on actual reading from device."""
-        return not self._client.available
+        return not self._client.available or not self._client.configuration_loaded
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        if self.platform.config_entry is not None:
+            self._command_buffer = self.hass.data.get(DATA_COMMAND_BUFFERS, {}).get(
+                self.platform.config_entry.entry_id
+            )
+
+    async def _async_send_command(
+        self, key: str, command: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Send a command to the spa, buffering it while offline if enabled."""
+        if self._command_buffer is None:
+            await command()
+        else:
+            await self._command_buffer.async_send(key, command)
+
+    @callback
+    def _async_get_state_writer(self) -> Callable[[], None]:
+        """Return the callback used to write state updates from the spa."""
+        if (
+            self.platform is None
+            or self.platform.config_entry is None
+            or (option := WRITE_INTERVAL_OPTIONS.get(self.entity_category)) is None
+        ):
+            return self.async_write_ha_state
+        options = self.platform.config_entry.options
+        if not (interval := options.get(option, DEFAULT_WRITE_INTERVAL)):
+            return self.async_write_ha_state
+
+        self._write_interval = interval
+        self.async_on_remove(self._async_cancel_trailing_write)
+        return self._async_write_ha_state_throttled
+
+    @callback
+    def _async_write_ha_state_throttled(self) -> None:
+        """Write the state at most once per interval without losing the last one."""
+        if self._unsub_write is not None:
+            return
+        if (delay := self._last_write + self._write_interval - monotonic()) > 0:
+            self._unsub_write = async_call_later(
+                self.hass, delay, self._async_trailing_write
+            )
+            return
+        self._last_write = monotonic()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_trailing_write(self, _: datetime) -> None:
+        """Write the latest state at the end of a throttled interval."""
+        self._unsub_write = None
+        self._last_write = monotonic()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_trailing_write(self) -> None:
+        """Cancel a pending trailing write."""
+        if self._unsub_write is not None:
+            self._unsub_write()
+            self._unsub_write = None
 
 
 class BalboaEntity(BalboaBaseEntity):
@@ -46,7 +143,10 @@ class BalboaEntity(BalboaBaseEntity):
 
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
-        self.async_on_remove(self._client.on(EVENT_UPDATE, self.async_write_ha_state))
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._client.on(EVENT_UPDATE, self._async_get_state_writer())
+        )
 
 
 class BalboaControlEntity(BalboaBaseEntity):
@@ -60,8 +160,22 @@ class BalboaControlEntity(BalboaBaseEntity):
     @property
     def available(self) -> bool:
         """Return whether the entity is available or not."""
-        return self._client.connected
+        # a restored spa shows its last known state until it reports in
+        return (
+            self._client.connected
+            or self._command_buffer is not None
+            or not self._client.configuration_loaded
+        )
 
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
-        self.async_on_remove(self._control.on(EVENT_UPDATE, self.async_write_ha_state))
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._control.on(EVENT_UPDATE, self._async_get_state_writer())
+        )
+
+    async def _async_set_state(self, state: int) -> None:
+        """Set the control state, buffering it while offline if enabled."""
+        await self._async_send_command(
+            self._control.name, partial(self._control.set_state, state)
+        )
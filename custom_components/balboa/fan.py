@@ -45,7 +45,7 @@ class BalboaPumpEntity(BalboaControlEntity, FanEntity):
             state = percentage_to_ordered_list_item(
                 self._control.options[1:], percentage
             )
-        await self._control.set_state(state)
+        await self._async_set_state(state)
 
     async def async_turn_on(
         self,
@@ -32,8 +32,8 @@ class BalboaLightEntity(BalboaControlEntity, LightEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
-        await self._control.set_state(1)
+        await self._async_set_state(1)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        await self._control.set_state(0)
+        await self._async_set_state(0)
@@ -0,0 +1,66 @@
+"""On-demand profiling of the Balboa spa update path."""
+from __future__ import annotations
+
+import asyncio
+from cProfile import Profile
+import logging
+from typing import Any
+
+from pybalboa import EVENT_UPDATE, SpaClient
+from pybalboa.control import EventMixin
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.util.dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _profile_updates(emitter: EventMixin, profiler: Profile) -> None:
+    """Profile the update event handling of a spa client or control."""
+    emit = emitter.emit
+
+    def _emit(event_name: str, *args: Any, **kwargs: Any) -> None:
+        if event_name != EVENT_UPDATE:
+            emit(event_name, *args, **kwargs)
+            return
+        profiler.enable()
+        try:
+            emit(event_name, *args, **kwargs)
+        finally:
+            profiler.disable()
+
+    emitter.emit = _emit  # type: ignore[assignment]
+
+
+async def async_profile_spas(
+    hass: HomeAssistant, spas: list[SpaClient], duration: float
+) -> str:
+    """Profile the update handling of the spas and return the report's path.
+
+    The update events, including the entity state writes they trigger, are
+    only wrapped for the duration of the profile. The wrappers are instance
+    attributes, so removing them restores the original update path.
+    """
+    emitters: list[EventMixin] = [
+        emitter for spa in spas for emitter in (spa, *spa.controls)
+    ]
+    if any("emit" in vars(emitter) for emitter in emitters):
+        raise HomeAssistantError("A profile is already running")
+
+    profiler = Profile()
+    for emitter in emitters:
+        _profile_updates(emitter, profiler)
+    _LOGGER.info("Profiling %s spas for %s seconds", len(spas), duration)
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        for emitter in emitters:
+            del emitter.emit
+
+    path = hass.config.path(
+        f"balboa_profile_{dt_util.utcnow().strftime('%Y%m%d%H%M%S')}.prof"
+    )
+    await hass.async_add_executor_job(profiler.dump_stats, path)
+    _LOGGER.info("Wrote spa update profile to %s", path)
+    return path
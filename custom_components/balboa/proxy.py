@@ -0,0 +1,210 @@
+"""Local proxy sharing a single Balboa spa module connection."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from random import uniform
+
+from pybalboa.client import DEFAULT_PORT
+from pybalboa.exceptions import SpaMessageError
+from pybalboa.utils import MESSAGE_DELIMETER_BYTE, cancel_task, read_one_message
+
+_LOGGER = logging.getLogger(__name__)
+
+CLIENT_QUEUE_SIZE = 64
+
+
+class SpaProxy:
+    """Fan a spa module's message stream out to any number of local clients.
+
+    The proxy keeps one upstream connection to the module. Every message
+    received from the module is forwarded to all connected clients and every
+    message sent by a client is written upstream, one whole message at a time.
+    Clients are only accepted while the upstream connection is up and are
+    dropped when it goes down, so they reconnect just like they would to the
+    module itself.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_PORT,
+        listen_host: str | None = None,
+        listen_port: int = DEFAULT_PORT,
+    ) -> None:
+        """Initialize the proxy."""
+        self._host = host
+        self._port = port
+        self._listen_host = listen_host
+        self._listen_port = listen_port
+
+        self._server: asyncio.AbstractServer | None = None
+        self._upstream: asyncio.Task | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._upstream_connected = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._clients: dict[asyncio.StreamWriter, asyncio.Queue[bytes]] = {}
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def connected(self) -> bool:
+        """Return `True` if the upstream connection is up."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def port(self) -> int:
+        """Return the port the proxy is listening on."""
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[0].getsockname()[1]
+        return self._listen_port
+
+    @property
+    def client_count(self) -> int:
+        """Return the number of connected clients."""
+        return len(self._clients)
+
+    async def async_connected(self, timeout: float = 10) -> bool:
+        """Wait for the upstream connection to be established."""
+        try:
+            await asyncio.wait_for(self._upstream_connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.connected
+
+    async def start(self) -> None:
+        """Start listening for clients and connecting upstream."""
+        self._server = await asyncio.start_server(
+            self._handle_client, self._listen_host, self._listen_port
+        )
+        self._upstream = asyncio.ensure_future(self._run_upstream())
+        _LOGGER.debug("%s -- proxy listening on port %s", self._host, self.port)
+
+    async def close(self) -> None:
+        """Stop the proxy and drop all connections."""
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        if self._writer is not None:
+            # a message read as the upstream task is cancelled can swallow the
+            # cancellation, the closed connection then ends it
+            self._writer.close()
+        await cancel_task(self._upstream)
+        self._upstream = None
+        self._drop_clients()
+        if self._handlers:
+            # closing a client's connection ends its handler; cancelling it
+            # instead would be reported as an error by the stream protocol
+            await asyncio.wait(self._handlers)
+        if server is not None:
+            await server.wait_closed()
+        _LOGGER.debug("%s -- proxy closed", self._host)
+
+    async def _run_upstream(self) -> None:
+        """Maintain the upstream connection and fan out its messages."""
+        attempt = 0
+        while self._server is not None:
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self._host, self._port), 10
+                )
+            except (asyncio.TimeoutError, OSError) as err:
+                _LOGGER.debug("%s ## proxy cannot connect: %s", self._host, err)
+                await asyncio.sleep(min(1 * 2**attempt + uniform(0, 1), 60))
+                attempt += 1
+                continue
+
+            _LOGGER.debug("%s -- proxy connected upstream", self._host)
+            self._writer = writer
+            self._upstream_connected.set()
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        data = await read_one_message(reader)
+                    except SpaMessageError as err:
+                        _LOGGER.debug("%s ## %s", self._host, err)
+                        continue
+                    except asyncio.TimeoutError:
+                        continue
+                    self._broadcast(_frame(data))
+            except (asyncio.IncompleteReadError, OSError) as err:
+                _LOGGER.debug("%s ## proxy lost upstream: %s", self._host, err)
+            finally:
+                writer.close()
+                if self._writer is writer:
+                    self._writer = None
+                self._upstream_connected.clear()
+                self._drop_clients()
+
+    def _broadcast(self, message: bytes) -> None:
+        """Queue a message for every client, dropping the oldest when full."""
+        for queue in self._clients.values():
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def _drop_clients(self) -> None:
+        """Disconnect all clients."""
+        for writer in self._clients:
+            writer.close()
+        self._clients.clear()
+
+    async def _send_upstream(self, message: bytes) -> None:
+        """Write a client message upstream, serialized with other clients."""
+        async with self._write_lock:
+            if not self.connected:
+                return
+            assert self._writer
+            try:
+                self._writer.write(message)
+                await self._writer.drain()
+            except OSError as err:
+                _LOGGER.debug("%s ## proxy error sending message: %s", self._host, err)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a client until it or the upstream connection goes away."""
+        peer = writer.get_extra_info("peername")
+        if not self.connected:
+            _LOGGER.debug("%s -- proxy rejected %s, not connected", self._host, peer)
+            writer.close()
+            return
+
+        _LOGGER.debug("%s -- proxy client connected: %s", self._host, peer)
+        handler = asyncio.current_task()
+        assert handler
+        self._handlers.add(handler)
+        queue: asyncio.Queue[bytes] = asyncio.Queue(CLIENT_QUEUE_SIZE)
+        self._clients[writer] = queue
+
+        async def _send() -> None:
+            try:
+                while True:
+                    writer.write(await queue.get())
+                    await writer.drain()
+            except OSError:
+                writer.close()
+
+        sender = asyncio.ensure_future(_send())
+        try:
+            while not writer.is_closing():
+                try:
+                    data = await read_one_message(reader, None)  # type: ignore[arg-type]
+                except SpaMessageError as err:
+                    _LOGGER.debug("%s ## %s: %s", self._host, peer, err)
+                    continue
+                await self._send_upstream(_frame(data))
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+            await cancel_task(sender)
+            self._handlers.discard(handler)
+            _LOGGER.debug("%s -- proxy client disconnected: %s", self._host, peer)
+
+
+def _frame(data: bytes) -> bytes:
+    """Wrap a message read with `read_one_message` in its delimiters."""
+    return MESSAGE_DELIMETER_BYTE + data + MESSAGE_DELIMETER_BYTE
@@ -0,0 +1,244 @@
+"""Weekly heat mode and set point schedules for Balboa spas."""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+import heapq
+from itertools import count
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .const import DATA_SCHEDULER, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.schedules"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+@dataclass(frozen=True)
+class ScheduleRule:
+    """A weekly transition to a heat mode and/or target temperature."""
+
+    weekdays: tuple[int, ...]
+    at: time
+    preset_mode: str | None = None
+    temperature: float | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ScheduleRule:
+        """Create a rule from its stored representation."""
+        return cls(
+            tuple(data["weekdays"]),
+            time.fromisoformat(data["at"]),
+            data.get("preset_mode"),
+            data.get("temperature"),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stored representation of the rule."""
+        return {
+            "weekdays": list(self.weekdays),
+            "at": self.at.isoformat(),
+            "preset_mode": self.preset_mode,
+            "temperature": self.temperature,
+        }
+
+
+def _transitions(
+    rules: Iterable[ScheduleRule], moment: datetime, offsets: Iterable[int]
+) -> Iterable[tuple[datetime, ScheduleRule]]:
+    """Yield the local transitions of the rules on the days offset from moment."""
+    moment = dt_util.as_local(moment)
+    for offset in offsets:
+        day = moment.date() + timedelta(days=offset)
+        for rule in rules:
+            if day.weekday() in rule.weekdays:
+                yield datetime.combine(day, rule.at, moment.tzinfo), rule
+
+
+def next_transition(
+    rules: list[ScheduleRule], after: datetime
+) -> tuple[datetime, ScheduleRule] | None:
+    """Return the first transition strictly after a moment."""
+    return min(
+        (item for item in _transitions(rules, after, range(8)) if item[0] > after),
+        key=lambda item: item[0],
+        default=None,
+    )
+
+
+def previous_transition(
+    rules: list[ScheduleRule], before: datetime
+) -> tuple[datetime, ScheduleRule] | None:
+    """Return the last transition at or before a moment."""
+    return max(
+        (
+            item
+            for item in _transitions(rules, before, range(-7, 1))
+            if item[0] <= before
+        ),
+        key=lambda item: item[0],
+        default=None,
+    )
+
+
+class BalboaScheduler:
+    """Run the schedules of all spas from a single timer.
+
+    Each attached spa has exactly one armed transition, its next one, in a heap
+    ordered by time across all spas. Only the earliest transition has a timer.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._data: dict[str, dict[str, Any]] = {}
+        self._rules: dict[str, list[ScheduleRule]] = {}
+        self._appliers: dict[str, Callable[[ScheduleRule], Awaitable[None]]] = {}
+
+        self._heap: list[tuple[datetime, int, str, ScheduleRule]] = []
+        self._armed: dict[str, int] = {}
+        self._sequence = count()
+        self._timer_at: datetime | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    async def async_load(self) -> None:
+        """Load the stored schedules."""
+        self._data = await self._store.async_load() or {}
+        self._rules = {
+            entry_id: [ScheduleRule.from_dict(rule) for rule in data["rules"]]
+            for entry_id, data in self._data.items()
+        }
+
+    def get_rules(self, entry_id: str) -> list[ScheduleRule]:
+        """Return the schedule rules of a spa."""
+        return self._rules.get(entry_id, [])
+
+    @callback
+    def async_attach(
+        self, entry_id: str, apply: Callable[[ScheduleRule], Awaitable[None]]
+    ) -> CALLBACK_TYPE:
+        """Run a spa's schedule, catching up on a transition missed while away."""
+        self._appliers[entry_id] = apply
+        if (rules := self._rules.get(entry_id)) and (
+            previous := previous_transition(rules, dt_util.utcnow())
+        ):
+            when, rule = previous
+            last_applied = self._data[entry_id].get("last_applied")
+            if last_applied is None or dt_util.parse_datetime(last_applied) < when:
+                _LOGGER.debug("Catching up on missed schedule transition at %s", when)
+                self._async_apply(entry_id, when, rule)
+        self._async_arm(entry_id, dt_util.utcnow())
+
+        @callback
+        def detach() -> None:
+            self._appliers.pop(entry_id, None)
+            self._armed.pop(entry_id, None)
+            self._async_update_timer()
+
+        return detach
+
+    @callback
+    def async_set_rules(self, entry_id: str, rules: list[ScheduleRule]) -> None:
+        """Replace the schedule of a spa, taking effect at its next transition."""
+        now = dt_util.utcnow()
+        if rules:
+            self._rules[entry_id] = rules
+            self._data[entry_id] = {
+                "rules": [rule.as_dict() for rule in rules],
+                "last_applied": now.isoformat(),
+            }
+        else:
+            self._rules.pop(entry_id, None)
+            self._data.pop(entry_id, None)
+        self._async_save()
+        self._async_arm(entry_id, now)
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Remove the schedule of a spa."""
+        self._appliers.pop(entry_id, None)
+        self.async_set_rules(entry_id, [])
+
+    @callback
+    def _async_apply(self, entry_id: str, when: datetime, rule: ScheduleRule) -> None:
+        """Apply a transition to a spa."""
+        self._data[entry_id]["last_applied"] = when.isoformat()
+        self._async_save()
+        self.hass.async_create_task(self._appliers[entry_id](rule))
+
+    @callback
+    def _async_arm(self, entry_id: str, after: datetime) -> None:
+        """Arm the next transition of a spa after a moment."""
+        self._armed.pop(entry_id, None)
+        if (
+            entry_id in self._appliers
+            and (rules := self._rules.get(entry_id))
+            and (upcoming := next_transition(rules, after))
+        ):
+            when, rule = upcoming
+            sequence = self._armed[entry_id] = next(self._sequence)
+            heapq.heappush(self._heap, (when, sequence, entry_id, rule))
+        self._async_update_timer()
+
+    @callback
+    def _async_update_timer(self) -> None:
+        """Keep the timer on the earliest armed transition."""
+        heap = self._heap
+        while heap and self._armed.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        when = heap[0][0] if heap else None
+        if when == self._timer_at:
+            return
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_at = when
+        if when is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self.hass, self._async_timer_fired, when
+            )
+
+    @callback
+    def _async_timer_fired(self, now: datetime) -> None:
+        """Apply all transitions that are due and arm the ones after them."""
+        self._unsub_timer = None
+        self._timer_at = None
+        due: list[tuple[str, datetime]] = []
+        while self._heap and self._heap[0][0] <= now:
+            when, sequence, entry_id, rule = heapq.heappop(self._heap)
+            if self._armed.get(entry_id) == sequence:
+                self._async_apply(entry_id, when, rule)
+                due.append((entry_id, when))
+        for entry_id, when in due:
+            self._async_arm(entry_id, when)
+        self._async_update_timer()
+
+    @callback
+    def _async_save(self) -> None:
+        """Schedule saving the schedules."""
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+
+async def async_get_scheduler(hass: HomeAssistant) -> BalboaScheduler:
+    """Return the scheduler, loading it on first use."""
+    if (task := hass.data.get(DATA_SCHEDULER)) is None:
+
+        async def _async_load() -> BalboaScheduler:
+            scheduler = BalboaScheduler(hass)
+            await scheduler.async_load()
+            return scheduler
+
+        task = hass.data[DATA_SCHEDULER] = hass.async_create_task(_async_load())
+    return await task
@@ -47,4 +47,4 @@ class BalboaSelectEntity(BalboaControlEntity, SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
-        await self._control.set_state(TEMP_RANGE_MAP[option]["value"])
+        await self._async_set_state(TEMP_RANGE_MAP[option]["value"])
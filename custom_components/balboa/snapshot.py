@@ -0,0 +1,181 @@
+"""Snapshots of Balboa spas, to set them up before they report in."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from pybalboa import EVENT_UPDATE, SpaClient
+from pybalboa.client import DEFAULT_PORT
+from pybalboa.control import FaultLog
+from pybalboa.enums import MessageType
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_SNAPSHOTS, DOMAIN
+
+STORAGE_KEY = f"{DOMAIN}.snapshots"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+SNAPSHOT_MESSAGE_TYPES = (
+    MessageType.MODULE_IDENTIFICATION,
+    MessageType.SYSTEM_INFORMATION,
+    MessageType.SETUP_PARAMETERS,
+    MessageType.DEVICE_CONFIGURATION,
+    MessageType.FILTER_CYCLE,
+    MessageType.STATUS_UPDATE,
+)
+
+
+class BalboaSpaClient(SpaClient):
+    """A spa client that can be restored from a snapshot of its messages.
+
+    The snapshot is the last message of each type that describes the spa: its
+    MAC address, model and firmware, temperature ranges, controls, filter
+    cycles and status. A restored client has all of that before it connects,
+    but is only loaded once the spa sends a live status. It requests its whole
+    configuration again when it connects, since the snapshot may be stale.
+
+    It also keeps the last fault log entry received, and emits an update for
+    it, which pybalboa does not. The first status after every connection is
+    emitted even if unchanged, so listeners learn the spa is back.
+    """
+
+    def __init__(self, host: str, port: int = DEFAULT_PORT) -> None:
+        """Initialize the spa client."""
+        super().__init__(host, port)
+        self._messages: dict[int, bytes] = {}
+        self._restored = False
+        self._fault_log: FaultLog | None = None
+
+    @property
+    def fault_log(self) -> FaultLog | None:
+        """Return the last fault log entry received."""
+        return self._fault_log
+
+    @property
+    def snapshot(self) -> list[bytes]:
+        """Return the last message of each type that describes the spa."""
+        return list(self._messages.values())
+
+    @property
+    def snapshot_complete(self) -> bool:
+        """Return whether the snapshot describes the whole spa."""
+        return len(self._messages) == len(SNAPSHOT_MESSAGE_TYPES)
+
+    def restore(self, snapshot: Iterable[bytes]) -> None:
+        """Restore the spa from a snapshot, as if it had sent its messages."""
+        for message in snapshot:
+            self._process_message(message)
+        self._restored = True
+        # the spa is loaded, and its status live, once it reports in
+        self._configuration_loaded.clear()
+        self._previous_status = None
+        self._last_message_received = None
+
+    async def _connect(self) -> bool:
+        """Connect to the spa, emitting its first status."""
+        if not self.connected:
+            self._previous_status = None
+        return await super()._connect()
+
+    async def request_all_configuration(self, wait: bool = False) -> None:
+        """Request the full spa configuration, refreshing a restored one."""
+        if self._restored:
+            self._restored = False
+            await super().request_all_configuration()
+        await super().request_all_configuration(wait)
+
+    def _process_message(self, data: bytes) -> None:
+        """Process a message, keeping it if it describes the spa."""
+        if data[3] in SNAPSHOT_MESSAGE_TYPES:
+            self._messages[data[3]] = data
+        super()._process_message(data)
+        if data[3] == MessageType.FAULT_LOG:
+            self._fault_log = self._fault
+            self.emit(EVENT_UPDATE)
+
+
+class BalboaSnapshotStore:
+    """Keep the snapshots of the spas across restarts.
+
+    The snapshot of a spa is saved shortly after it reports in, when it is
+    unloaded and when Home Assistant stops, so it holds its last status.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the snapshot store."""
+        self.hass = hass
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._data: dict[str, dict[str, Any]] = {}
+        self._spas: dict[str, BalboaSpaClient] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored snapshots."""
+        self._data = await self._store.async_load() or {}
+        self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_save)
+
+    def get(self, entry_id: str) -> list[bytes]:
+        """Return the stored snapshot of a spa."""
+        if (data := self._data.get(entry_id)) is None:
+            return []
+        return [bytes.fromhex(message) for message in data["messages"]]
+
+    @callback
+    def async_track(self, entry_id: str, spa: BalboaSpaClient) -> CALLBACK_TYPE:
+        """Save the snapshot of a spa while it is in use."""
+        self._spas[entry_id] = spa
+        self._async_save()
+
+        @callback
+        def _async_untrack() -> None:
+            if self._spas.get(entry_id) is spa:
+                self._async_update(entry_id, spa)
+                del self._spas[entry_id]
+                self._async_save()
+
+        return _async_untrack
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Remove the snapshot of a removed spa."""
+        self._spas.pop(entry_id, None)
+        if self._data.pop(entry_id, None) is not None:
+            self._async_save()
+
+    @callback
+    def _async_update(self, entry_id: str, spa: BalboaSpaClient) -> None:
+        """Take the snapshot of a spa that describes it completely."""
+        if spa.snapshot_complete:
+            self._data[entry_id] = {
+                "messages": [message.hex() for message in spa.snapshot]
+            }
+
+    @callback
+    def _async_save(self, _: Event | None = None) -> None:
+        """Schedule saving the snapshots."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the snapshots to save, with the latest of the spas in use."""
+        for entry_id, spa in self._spas.items():
+            self._async_update(entry_id, spa)
+        return self._data
+
+
+async def async_get_snapshot_store(hass: HomeAssistant) -> BalboaSnapshotStore:
+    """Return the snapshot store, loading it on first use."""
+    if (task := hass.data.get(DATA_SNAPSHOTS)) is None:
+
+        async def _async_load() -> BalboaSnapshotStore:
+            store = BalboaSnapshotStore(hass)
+            await store.async_load()
+            return store
+
+        task = hass.data[DATA_SNAPSHOTS] = hass.async_create_task(_async_load())
+    return await task
@@ -1,6 +1,7 @@
 """Support for Balboa Spa switches."""
 from __future__ import annotations
 
+from functools import partial
 from typing import Any
 
 from pybalboa import SpaClient
@@ -14,6 +15,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import DOMAIN
 from .entity import BalboaControlEntity, BalboaEntity
 
+FILTER_CYCLE_2_KEY = "filter_cycle_2_enabled"
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -37,11 +40,11 @@ class BalboaSwitchEntity(BalboaControlEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
-        await self._control.set_state(1)
+        await self._async_set_state(1)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        await self._control.set_state(0)
+        await self._async_set_state(0)
 
 
 class BalboaFilterSwitchEntity(BalboaEntity, SwitchEntity):
@@ -57,8 +60,14 @@ class BalboaFilterSwitchEntity(BalboaEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
-        await self._client.set_filter_cycle(filter_cycle_2_enabled=True)
+        await self._async_send_command(
+            FILTER_CYCLE_2_KEY,
+            partial(self._client.set_filter_cycle, filter_cycle_2_enabled=True),
+        )
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        await self._client.set_filter_cycle(filter_cycle_2_enabled=False)
+        await self._async_send_command(
+            FILTER_CYCLE_2_KEY,
+            partial(self._client.set_filter_cycle, filter_cycle_2_enabled=False),
+        )
@@ -0,0 +1,206 @@
+"""Events for discrete state transitions of Balboa spas."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from enum import IntEnum
+from typing import Any
+
+from pybalboa import EVENT_UPDATE, SpaClient, SpaControl
+from pybalboa.enums import ControlType, HeatState, UnknownState
+
+from homeassistant.const import CONF_DEVICE_ID, CONF_TYPE
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN, EVENT_TRANSITION
+from .snapshot import BalboaSpaClient
+
+ATTR_CODE = "code"
+ATTR_FROM = "from"
+ATTR_TO = "to"
+CONF_SUBTYPE = "subtype"
+
+FAULT = "fault"
+FAULT_LOG_INTERVAL = timedelta(minutes=1)
+NEWEST_FAULT_LOG_ENTRY = 0xFF
+HEAT_STATE = "heat_state"
+FILTER_CYCLES = ("Filter cycle 1", "Filter cycle 2")
+# pybalboa 1.0.0 parses the blower states into the misters, so blowers are
+# never updated and cannot transition
+TRACKED_CONTROL_TYPES = (
+    ControlType.AUX,
+    ControlType.CIRCULATION_PUMP,
+    ControlType.LIGHT,
+    ControlType.MISTER,
+    ControlType.PUMP,
+)
+
+
+def _tracked_controls(spa: SpaClient) -> list[SpaControl]:
+    """Return the controls whose transitions fire events."""
+    return [
+        control
+        for control in spa.controls
+        if control.control_type in TRACKED_CONTROL_TYPES
+    ]
+
+
+def get_transition_states(
+    spa: BalboaSpaClient,
+) -> dict[str, IntEnum | bool | tuple[int, int] | None]:
+    """Return the spa's current discrete states by subject.
+
+    The state of the fault subject identifies the newest fault log entry.
+    """
+    fault = spa.fault_log
+    return {
+        FAULT: (fault.entry_number, fault.message_code)
+        if fault and fault.count
+        else None,
+        HEAT_STATE: spa.heat_state,
+        FILTER_CYCLES[0]: spa.filter_cycle_1_running,
+        FILTER_CYCLES[1]: spa.filter_cycle_2_running,
+        **{control.name: control.state for control in _tracked_controls(spa)},
+    }
+
+
+def get_transition_type(subject: str, state: IntEnum | bool) -> str:
+    """Return the type of a transition of a subject to a state."""
+    if subject == FAULT:
+        return FAULT
+    if subject == HEAT_STATE:
+        return f"heat_state_{state.name.lower()}"  # type: ignore[union-attr]
+    if subject in FILTER_CYCLES:
+        return "filter_cycle_started" if state else "filter_cycle_ended"
+    return f"turned_{state.name.lower()}"  # type: ignore[union-attr]
+
+
+def get_transitions(spa: SpaClient) -> list[dict[str, str]]:
+    """Return the types and subtypes of the transitions a spa can make."""
+    transitions = [{CONF_TYPE: FAULT}]
+    transitions.extend(
+        {CONF_TYPE: get_transition_type(HEAT_STATE, state)} for state in HeatState
+    )
+    transitions.extend(
+        {CONF_TYPE: get_transition_type(subject, running), CONF_SUBTYPE: subject}
+        for subject in FILTER_CYCLES
+        for running in (True, False)
+    )
+    transitions.extend(
+        {
+            CONF_TYPE: get_transition_type(control.name, state),
+            CONF_SUBTYPE: control.name,
+        }
+        for control in _tracked_controls(spa)
+        for state in control.options
+    )
+    return transitions
+
+
+class SpaTransitionTracker:
+    """Fire an event for each discrete state transition of a spa.
+
+    The controls and the spa each emit an update while a message is parsed, so
+    the states are compared once per event loop iteration, after the whole
+    message has been applied. Subjects whose state did not change, or changed
+    to or from unknown, do not fire.
+
+    The newest fault log entry is requested periodically, and a new entry
+    fires a fault event with its code. The entry present when tracking starts
+    does not fire.
+    """
+
+    def __init__(self, hass: HomeAssistant, spa: BalboaSpaClient) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self._spa = spa
+        self._states: dict[str, IntEnum | bool | tuple[int, int] | None] = {}
+        self._device_id: str | None = None
+        self._scheduled = False
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start firing transition events."""
+        self._states = get_transition_states(self._spa)
+        unsub_update = self._spa.on(EVENT_UPDATE, self._async_schedule_diff)
+        unsub_fault_log = async_track_time_interval(
+            self.hass, self._async_request_fault_log, FAULT_LOG_INTERVAL
+        )
+        self.hass.async_create_task(self._async_request_fault_log())
+
+        @callback
+        def _async_stop() -> None:
+            unsub_update()
+            unsub_fault_log()
+
+        return _async_stop
+
+    async def _async_request_fault_log(self, _: datetime | None = None) -> None:
+        """Request the newest fault log entry."""
+        if self._spa.connected:
+            await self._spa.request_fault_log(NEWEST_FAULT_LOG_ENTRY)
+
+    @callback
+    def _async_schedule_diff(self) -> None:
+        """Compare the states once the current message has been applied."""
+        if not self._scheduled:
+            self._scheduled = True
+            self.hass.loop.call_soon(self._async_diff)
+
+    @callback
+    def _async_diff(self) -> None:
+        """Fire an event for each state that changed since the last comparison."""
+        self._scheduled = False
+        states = get_transition_states(self._spa)
+        if states == self._states:
+            return
+        previous, self._states = self._states, states
+        for subject, state in states.items():
+            old = previous.get(subject)
+            if old == state or UnknownState.UNKNOWN in (old, state):
+                continue
+            if subject == FAULT:
+                if old is not None and state is not None:
+                    self._async_fire_fault(state[1])  # type: ignore[index]
+                continue
+            data: dict[str, Any] = {
+                CONF_DEVICE_ID: self._get_device_id(),
+                CONF_TYPE: get_transition_type(subject, state),
+                ATTR_FROM: _state_name(old),
+                ATTR_TO: _state_name(state),
+            }
+            if subject != HEAT_STATE:
+                data[CONF_SUBTYPE] = subject
+            self.hass.bus.async_fire(EVENT_TRANSITION, data)
+
+    @callback
+    def _async_fire_fault(self, code: int) -> None:
+        """Fire an event for a new fault log entry."""
+        self.hass.bus.async_fire(
+            EVENT_TRANSITION,
+            {
+                CONF_DEVICE_ID: self._get_device_id(),
+                CONF_TYPE: FAULT,
+                ATTR_CODE: code,
+            },
+        )
+
+    def _get_device_id(self) -> str | None:
+        """Return the id of the spa's device."""
+        if self._device_id is None and (
+            device := dr.async_get(self.hass).async_get_device(
+                {(DOMAIN, self._spa.mac_address)}
+            )
+        ):
+            self._device_id = device.id
+        return self._device_id
+
+
+def _state_name(state: IntEnum | bool | None) -> str | None:
+    """Return the event representation of a state."""
+    if state is None:
+        return None
+    if isinstance(state, bool):
+        return "on" if state else "off"
+    return state.name.lower()
@@ -0,0 +1,167 @@
+"""Websocket API for live Balboa spa telemetry."""
+from __future__ import annotations
+
+from datetime import datetime
+from time import monotonic
+from typing import Any
+
+from pybalboa import EVENT_UPDATE, SpaClient
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_SUBSCRIPTIONS, DOMAIN
+
+ATTR_ENTRY_ID = "entry_id"
+SEND_INTERVAL = 1
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, ws_subscribe)
+
+
+def get_telemetry(spa: SpaClient) -> dict[str, Any]:
+    """Return the spa's current telemetry."""
+    if not spa.configuration_loaded:
+        return {}
+    return {
+        "temperature": spa.temperature,
+        "target_temperature": spa.target_temperature,
+        "heat_state": spa.heat_state.name.lower(),
+        "heat_mode": spa.heat_mode.state.name.lower(),
+        "pumps": [pump.state.value for pump in spa.pumps],
+        "time": f"{spa.time_hour:02d}:{spa.time_minute:02d}",
+    }
+
+
+class TelemetrySubscription:
+    """Send the telemetry changes of a config entry's spa to a websocket connection.
+
+    A change is sent right away unless one was sent less than
+    ``SEND_INTERVAL`` seconds ago. In that case it is merged into a single
+    pending delta, which is sent when the interval ends. The subscription
+    follows the entry's current client, so it survives an entry reload.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        entry_id: str,
+    ) -> None:
+        """Initialize the subscription."""
+        self.hass = hass
+        self._connection = connection
+        self._msg_id = msg_id
+        self._entry_id = entry_id
+        self._spa: SpaClient | None = None
+        self._unsub_spa: CALLBACK_TYPE | None = None
+        self._unsub_send: CALLBACK_TYPE | None = None
+        self._last_send = 0.0
+        self._telemetry: dict[str, Any] = {}
+        self._pending: dict[str, Any] = {}
+
+    @callback
+    def async_start(self, spa: SpaClient) -> CALLBACK_TYPE:
+        """Send the current telemetry and start sending changes."""
+        self.hass.data.setdefault(DATA_SUBSCRIPTIONS, {}).setdefault(
+            self._entry_id, set()
+        ).add(self)
+        self.async_set_spa(spa)
+        return self._async_stop
+
+    @callback
+    def async_set_spa(self, spa: SpaClient | None) -> None:
+        """Follow the telemetry of another client of the spa, or of none."""
+        if self._unsub_spa is not None:
+            self._unsub_spa()
+            self._unsub_spa = None
+        self._spa = spa
+        if spa is not None:
+            self._unsub_spa = spa.on(EVENT_UPDATE, self._async_update)
+            self._async_update()
+
+    @callback
+    def _async_stop(self) -> None:
+        """Stop sending changes."""
+        self.async_set_spa(None)
+        if self._unsub_send is not None:
+            self._unsub_send()
+            self._unsub_send = None
+        subscriptions = self.hass.data[DATA_SUBSCRIPTIONS]
+        subscriptions[self._entry_id].discard(self)
+        if not subscriptions[self._entry_id]:
+            del subscriptions[self._entry_id]
+
+    @callback
+    def _async_update(self) -> None:
+        """Send or queue the telemetry that changed since it was last seen."""
+        assert self._spa is not None
+        telemetry = get_telemetry(self._spa)
+        if not telemetry or telemetry == self._telemetry:
+            return
+        self._pending.update(
+            (key, value)
+            for key, value in telemetry.items()
+            if self._telemetry.get(key) != value
+        )
+        self._telemetry = telemetry
+        if self._unsub_send is not None:
+            return
+        if (delay := self._last_send + SEND_INTERVAL - monotonic()) > 0:
+            self._unsub_send = async_call_later(
+                self.hass, delay, self._async_trailing_send
+            )
+            return
+        self._async_send()
+
+    @callback
+    def _async_trailing_send(self, _: datetime) -> None:
+        """Send the changes merged during an interval."""
+        self._unsub_send = None
+        self._async_send()
+
+    @callback
+    def _async_send(self) -> None:
+        """Send the pending delta."""
+        if self._pending:
+            self._last_send = monotonic()
+            self._connection.send_message(
+                websocket_api.event_message(self._msg_id, self._pending)
+            )
+            self._pending = {}
+
+
+@callback
+def async_update_subscriptions(
+    hass: HomeAssistant, entry_id: str, spa: SpaClient | None
+) -> None:
+    """Point the telemetry subscriptions of a config entry at its current client."""
+    for subscription in hass.data.get(DATA_SUBSCRIPTIONS, {}).get(entry_id, ()):
+        subscription.async_set_spa(spa)
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): f"{DOMAIN}/subscribe", vol.Required(ATTR_ENTRY_ID): str}
+)
+@callback
+def ws_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to a spa's live telemetry."""
+    if (spa := hass.data.get(DOMAIN, {}).get(msg[ATTR_ENTRY_ID])) is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Spa not found")
+        return
+
+    subscription = TelemetrySubscription(
+        hass, connection, msg["id"], msg[ATTR_ENTRY_ID]
+    )
+    connection.send_result(msg["id"])
+    connection.subscriptions[msg["id"]] = subscription.async_start(spa)
@@ -0,0 +1 @@
+"""Tests for the Balboa Spa Client integration."""
@@ -0,0 +1,109 @@
+"""Measure the memory used by the entities of many spas.
+
+Run with ``python -m tests.bench_entity_memory [spa count]``. The spas are real
+clients configured by a local stand-in module, and their entities are built
+the same way the platforms build them. The footprint is measured once with the
+device metadata shared per spa and once with it built for every entity.
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import sys
+import tracemalloc
+from unittest.mock import patch
+from weakref import WeakKeyDictionary
+
+from pybalboa import SpaClient
+
+from custom_components.balboa import entity
+from custom_components.balboa.binary_sensor import (
+    BINARY_SENSOR_DESCRIPTIONS,
+    CIRCULATION_PUMP_DESCRIPTION,
+    BalboaBinarySensorEntity,
+)
+from custom_components.balboa.climate import BalboaClimateEntity
+from custom_components.balboa.fan import BalboaPumpEntity
+from custom_components.balboa.light import BalboaLightEntity
+from custom_components.balboa.select import BalboaSelectEntity
+from custom_components.balboa.sensor import (
+    FILTER_CYCLE_DESCRIPTIONS,
+    BalboaSensorEntity,
+)
+from custom_components.balboa.switch import (
+    BalboaFilterSwitchEntity,
+    BalboaSwitchEntity,
+)
+
+from .common import SpaModule
+
+DEFAULT_SPA_COUNT = 100
+
+
+class _NoCache(dict):
+    """A device metadata cache that never keeps anything."""
+
+    def __setitem__(self, key: SpaClient, value: object) -> None:
+        """Drop the metadata."""
+
+
+def build_entities(spa: SpaClient) -> list[entity.BalboaBaseEntity]:
+    """Build the entities of a spa like the platforms do."""
+    entities: list[entity.BalboaBaseEntity] = [
+        BalboaBinarySensorEntity(spa, description)
+        for description in BINARY_SENSOR_DESCRIPTIONS
+    ]
+    if spa.circulation_pump:
+        entities.append(BalboaBinarySensorEntity(spa, CIRCULATION_PUMP_DESCRIPTION))
+    entities.append(BalboaClimateEntity(spa))
+    entities.extend(BalboaPumpEntity(pump) for pump in spa.pumps)
+    entities.extend(BalboaLightEntity(light) for light in spa.lights)
+    entities.append(BalboaSelectEntity(spa.temperature_range))
+    entities.extend(
+        BalboaSensorEntity(spa, description)
+        for description in FILTER_CYCLE_DESCRIPTIONS
+    )
+    entities.append(BalboaFilterSwitchEntity(spa, "Filter cycle 2 enabled"))
+    entities.extend(BalboaSwitchEntity(control) for control in (*spa.aux, *spa.misters))
+    return entities
+
+
+def measure(spas: list[SpaClient]) -> tuple[int, int]:
+    """Return the entity count and the bytes allocated building them."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    entities = [build_entities(spa) for spa in spas]
+    allocated = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return sum(map(len, entities)), allocated
+
+
+async def main(spa_count: int) -> None:
+    """Report the per-entity and per-spa entity footprint."""
+    module = SpaModule()
+    await module.start()
+    spas = [SpaClient("127.0.0.1", module.port) for _ in range(spa_count)]
+    try:
+        for spa in spas:
+            assert await spa.connect() and await spa.async_configuration_loaded()
+
+        for label, cache in (
+            ("shared device metadata", WeakKeyDictionary()),
+            ("per-entity device metadata", _NoCache()),
+        ):
+            with patch.object(entity, "_DEVICE_METADATA", cache):
+                count, allocated = measure(spas)
+            print(
+                f"{label}: {spa_count} spas, {count} entities, "
+                f"{allocated / count:.0f} B per entity, "
+                f"{allocated / spa_count / 1024:.1f} KiB per spa"
+            )
+    finally:
+        for spa in spas:
+            await spa.disconnect()
+        await module.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SPA_COUNT))
@@ -0,0 +1,179 @@
+"""Common helpers for the Balboa Spa Client tests."""
+from __future__ import annotations
+
+import asyncio
+
+from pybalboa.enums import MessageType, SettingsCode
+from pybalboa.exceptions import SpaMessageError
+from pybalboa.utils import MESSAGE_DELIMETER_BYTE, calculate_checksum, read_one_message
+
+MAC_ADDRESS = "00:15:27:00:00:01"
+MODEL = "BFBP20"
+
+
+def build_message(message_type: MessageType, payload: bytes) -> bytes:
+    """Return a framed message as sent by a spa module."""
+    data = bytes((len(payload) + 5, 0x0A, 0xBF, message_type, *payload))
+    return (
+        MESSAGE_DELIMETER_BYTE
+        + data
+        + bytes((calculate_checksum(data),))
+        + MESSAGE_DELIMETER_BYTE
+    )
+
+
+def module_identification(mac_address: str = MAC_ADDRESS) -> bytes:
+    """Return a module identification message."""
+    mac = bytes.fromhex(mac_address.replace(":", ""))
+    return build_message(
+        MessageType.MODULE_IDENTIFICATION, bytes(3) + mac + bytes(range(16))
+    )
+
+
+def system_information(model: str = MODEL) -> bytes:
+    """Return a system information message."""
+    return build_message(
+        MessageType.SYSTEM_INFORMATION,
+        bytes((100, 226, 43, 0))
+        + model.ljust(8).encode()
+        + bytes((10, 0xA1, 0xB2, 0xC3, 0xD4, 0x01, 0x0A, 0x00, 0x00)),
+    )
+
+
+def setup_parameters() -> bytes:
+    """Return a setup parameters message."""
+    return build_message(
+        MessageType.SETUP_PARAMETERS, bytes((0, 0, 50, 80, 80, 104, 0, 0x03, 0))
+    )
+
+
+def device_configuration() -> bytes:
+    """Return a device configuration message.
+
+    The spa has a two speed pump 1, a single speed pump 2, a light, a
+    circulation pump and an aux.
+    """
+    return build_message(
+        MessageType.DEVICE_CONFIGURATION, bytes((0x06, 0x00, 0x01, 0x80, 0x01, 0x00))
+    )
+
+
+def filter_cycle() -> bytes:
+    """Return a filter cycle message."""
+    return build_message(MessageType.FILTER_CYCLE, bytes((20, 0, 2, 0, 0x88, 0, 1, 0)))
+
+
+def status_update(
+    temperature: int = 100,
+    target_temperature: int = 102,
+    heat_state: int = 0,
+    pumps: int = 0,
+    hour: int = 12,
+    minute: int = 0,
+) -> bytes:
+    """Return a status update message, with temperatures in °F."""
+    payload = bytearray(24)
+    payload[2] = temperature
+    payload[3] = hour
+    payload[4] = minute
+    payload[9] = 0x02
+    payload[10] = 0x04 | heat_state << 4
+    payload[11] = pumps
+    payload[20] = target_temperature
+    return build_message(MessageType.STATUS_UPDATE, bytes(payload))
+
+
+def fault_log(count: int = 1, entry_number: int = 0, message_code: int = 16) -> bytes:
+    """Return a fault log message, with the newest entry by default."""
+    return build_message(
+        MessageType.FAULT_LOG,
+        bytes((count, entry_number, message_code, 0, 12, 0, 0, 102, 100, 100)),
+    )
+
+
+RESPONSES = {
+    (MessageType.DEVICE_PRESENT, None): module_identification,
+    (MessageType.REQUEST, SettingsCode.SYSTEM_INFORMATION): system_information,
+    (MessageType.REQUEST, SettingsCode.SETUP_PARAMETERS): setup_parameters,
+    (MessageType.REQUEST, SettingsCode.DEVICE_CONFIGURATION): device_configuration,
+    (MessageType.REQUEST, SettingsCode.FILTER_CYCLE): filter_cycle,
+    (MessageType.REQUEST, SettingsCode.FAULT_LOG): fault_log,
+}
+
+
+class SpaModule:
+    """A local stand-in for a spa's Wi-Fi module.
+
+    It answers the configuration requests of pybalboa, each answer followed by
+    its current status like the periodic status updates of a real module, and
+    records the messages it receives and the number of connections. Clients get
+    the status when they connect. The answers can be changed per module through
+    its responses.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the stand-in module."""
+        self.received: list[bytes] = []
+        self.connection_count = 0
+        self.status = status_update()
+        self.responses = dict(RESPONSES)
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def port(self) -> int:
+        """Return the port the module is listening on."""
+        assert self._server
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def client_count(self) -> int:
+        """Return the number of connected clients."""
+        return len(self._writers)
+
+    async def start(self, port: int = 0) -> None:
+        """Start listening for clients, on any free port by default."""
+        self._server = await asyncio.start_server(
+            self._handle_client, "127.0.0.1", port
+        )
+
+    async def close(self) -> None:
+        """Stop listening and disconnect all clients."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self._writers:
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    async def broadcast(self, message: bytes) -> None:
+        """Send a message to all clients."""
+        for writer in list(self._writers):
+            writer.write(message)
+            await writer.drain()
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a client until it disconnects."""
+        self._handlers.add(asyncio.current_task())  # type: ignore[arg-type]
+        self._writers.add(writer)
+        self.connection_count += 1
+        try:
+            writer.write(self.status)
+            while True:
+                try:
+                    data = await read_one_message(reader, None)  # type: ignore[arg-type]
+                except SpaMessageError:
+                    continue
+                self.received.append(data)
+                settings = data[4] if data[3] == MessageType.REQUEST else None
+                if response := self.responses.get((data[3], settings)):
+                    writer.write(response() + self.status)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
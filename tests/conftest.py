@@ -0,0 +1,52 @@
+"""Fixtures for the Balboa Spa Client tests."""
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.balboa.const import DOMAIN
+from custom_components.balboa.snapshot import BalboaSpaClient
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .common import MAC_ADDRESS, SpaModule
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable custom integrations."""
+    yield
+
+
+@pytest.fixture
+async def spa_module(socket_enabled) -> AsyncGenerator[SpaModule, None]:
+    """Return a running stand-in spa module."""
+    module = SpaModule()
+    await module.start()
+    yield module
+    await module.close()
+
+
+@pytest.fixture
+async def config_entry(
+    hass: HomeAssistant, spa_module: SpaModule
+) -> AsyncGenerator[MockConfigEntry, None]:
+    """Set up a spa config entry connected to the stand-in module."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_HOST: "127.0.0.1"}, unique_id=MAC_ADDRESS
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.balboa.BalboaSpaClient",
+        partial(BalboaSpaClient, port=spa_module.port),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        yield entry
+        if hass.config_entries.async_get_entry(entry.entry_id) is not None:
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
@@ -0,0 +1,145 @@
+"""Tests for the Balboa command buffer."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from functools import partial
+from unittest.mock import MagicMock, patch
+
+from freezegun.api import FrozenDateTimeFactory
+from pybalboa.enums import MessageType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.balboa.command_buffer import DEFAULT_TTL, SpaCommandBuffer
+from custom_components.balboa.const import CONF_COMMAND_BUFFER, DOMAIN
+from custom_components.balboa.snapshot import BalboaSpaClient
+from homeassistant.components.climate import (
+    ATTR_TEMPERATURE,
+    DOMAIN as CLIMATE_DOMAIN,
+    SERVICE_SET_TEMPERATURE,
+)
+from homeassistant.components.fan import ATTR_PERCENTAGE, DOMAIN as FAN_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_HOST,
+    SERVICE_TURN_OFF,
+    SERVICE_TURN_ON,
+)
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+from .common import MAC_ADDRESS, SpaModule, build_message
+
+TOGGLE_PUMP_1 = build_message(MessageType.TOGGLE_STATE, bytes((0x04,)))
+SET_TEMPERATURE_104 = build_message(MessageType.SET_TEMPERATURE, bytes((104,)))
+
+
+async def _wait_for(predicate: Callable[[], bool]) -> None:
+    """Wait until a condition is met."""
+    async with asyncio.timeout(5):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+async def test_final_commands_replayed(
+    hass: HomeAssistant, spa_module: SpaModule
+) -> None:
+    """Test only the final commands sent while disconnected are replayed."""
+    port = spa_module.port
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "127.0.0.1"},
+        options={CONF_COMMAND_BUFFER: True},
+        unique_id=MAC_ADDRESS,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.balboa.BalboaSpaClient",
+        partial(BalboaSpaClient, port=port),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    spa: BalboaSpaClient = hass.data[DOMAIN][entry.entry_id]
+
+    # pybalboa only notices a closed module once its keep-alives fail
+    await spa_module.close()
+    await spa.disconnect()
+    for service, data in (
+        (SERVICE_TURN_OFF, {}),
+        (SERVICE_TURN_ON, {ATTR_PERCENTAGE: 100}),
+    ):
+        await hass.services.async_call(
+            FAN_DOMAIN,
+            service,
+            {ATTR_ENTITY_ID: "fan.bfbp20_pump_1", **data},
+            blocking=True,
+        )
+    await hass.services.async_call(
+        CLIMATE_DOMAIN,
+        SERVICE_SET_TEMPERATURE,
+        {ATTR_ENTITY_ID: "climate.bfbp20", ATTR_TEMPERATURE: 40},
+        blocking=True,
+    )
+    spa_module.received.clear()
+
+    await spa_module.start(port)
+    assert await spa.connect()
+    commands = (TOGGLE_PUMP_1[1:-1], SET_TEMPERATURE_104[1:-1])
+
+    def sent() -> list[bytes]:
+        return [message for message in spa_module.received if message in commands]
+
+    await _wait_for(lambda: len(sent()) == 3)
+    await hass.async_block_till_done()
+    # pump 1 goes from off to high in two toggles
+    assert sent() == [commands[0], commands[0], commands[1]]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+def _recorder(sent: list[str], name: str) -> Callable[[], Awaitable[None]]:
+    """Return a command that records its name when sent."""
+
+    async def _command() -> None:
+        sent.append(name)
+
+    return _command
+
+
+async def test_buffer_rules(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test what is replayed, when, and in which order."""
+    spa = MagicMock(connected=False, last_message_received=None)
+    buffer = SpaCommandBuffer(hass, spa)
+    buffer.async_start()
+    on_update = spa.on.call_args[0][1]
+    sent: list[str] = []
+
+    await buffer.async_send("Pump 1", _recorder(sent, "pump expired"))
+    freezer.tick(DEFAULT_TTL + timedelta(seconds=1))
+    await buffer.async_send("Light 1", _recorder(sent, "light on"))
+    await buffer.async_send("Light 1", _recorder(sent, "light off"))
+    await buffer.async_send("Aux 1", _recorder(sent, "aux on"))
+
+    # connected, but nothing newer than the buffered commands received yet
+    spa.connected = True
+    spa.last_message_received = dt_util.utcnow()
+    on_update()
+    await hass.async_block_till_done()
+    assert not sent
+
+    # a command sent meanwhile waits behind the buffered ones
+    await buffer.async_send("Pump 2", _recorder(sent, "pump on"))
+    assert not sent
+
+    freezer.tick(timedelta(seconds=1))
+    spa.last_message_received = dt_util.utcnow()
+    on_update()
+    await hass.async_block_till_done()
+    assert sent == ["light off", "aux on", "pump on"]
+
+    await buffer.async_send("Pump 2", _recorder(sent, "pump off"))
+    assert sent[-1] == "pump off"
@@ -0,0 +1,107 @@
+"""Tests for the Balboa Spa Client config flow."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Generator
+from datetime import timedelta
+from functools import partial
+from unittest.mock import patch
+
+from pybalboa import SpaClient
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.balboa.config_flow import PROBE_CACHE_TTL
+from custom_components.balboa.const import DOMAIN
+from homeassistant import config_entries
+from homeassistant.components.dhcp import DhcpServiceInfo
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+import homeassistant.util.dt as dt_util
+
+from .common import MAC_ADDRESS, MODEL, SpaModule
+
+DHCP_DISCOVERY = DhcpServiceInfo(
+    ip="127.0.0.1", hostname="bwgspa", macaddress=MAC_ADDRESS.replace(":", "")
+)
+
+
+@pytest.fixture(autouse=True)
+def probe_module(spa_module: SpaModule) -> Generator[None, None, None]:
+    """Probe the stand-in module and skip setting up the created entries."""
+    with patch(
+        "custom_components.balboa.config_flow.SpaClient",
+        partial(SpaClient, port=spa_module.port),
+    ), patch("custom_components.balboa.async_setup_entry", return_value=True):
+        yield
+
+
+async def _async_expire_probes(hass: HomeAssistant) -> None:
+    """Let the cached probes expire."""
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=PROBE_CACHE_TTL + 1)
+    )
+    await hass.async_block_till_done()
+
+
+async def test_concurrent_flows_share_probe(
+    hass: HomeAssistant, spa_module: SpaModule
+) -> None:
+    """Test concurrent flows for the same spa connect to it once."""
+    results = await asyncio.gather(
+        *(
+            hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={"source": config_entries.SOURCE_DHCP},
+                data=DHCP_DISCOVERY,
+            )
+            for _ in range(2)
+        )
+    )
+    assert sorted(result["type"] for result in results) == [
+        FlowResultType.ABORT,
+        FlowResultType.FORM,
+    ]
+    dhcp = next(result for result in results if result["type"] is FlowResultType.FORM)
+    user = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    results = await asyncio.gather(
+        hass.config_entries.flow.async_configure(dhcp["flow_id"], {}),
+        hass.config_entries.flow.async_configure(
+            user["flow_id"], {CONF_HOST: "127.0.0.1"}
+        ),
+    )
+    assert results[0]["type"] is FlowResultType.CREATE_ENTRY
+    assert results[0]["title"] == MODEL
+    assert results[1]["type"] is FlowResultType.ABORT
+    assert spa_module.connection_count == 1
+
+    await _async_expire_probes(hass)
+
+
+async def test_probe_reused_until_expired(
+    hass: HomeAssistant, spa_module: SpaModule
+) -> None:
+    """Test a repeated probe reuses the result until it expires."""
+
+    async def _async_probe() -> None:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": config_entries.SOURCE_USER},
+            data={CONF_HOST: "127.0.0.1"},
+        )
+        assert result["type"] is FlowResultType.CREATE_ENTRY
+        assert await hass.config_entries.async_remove(result["result"].entry_id)
+
+    await _async_probe()
+    await _async_probe()
+    assert spa_module.connection_count == 1
+
+    await _async_expire_probes(hass)
+    await _async_probe()
+    assert spa_module.connection_count == 2
+
+    await _async_expire_probes(hass)
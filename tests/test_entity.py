@@ -0,0 +1,33 @@
+"""Tests for the Balboa entities."""
+from __future__ import annotations
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.balboa.const import DOMAIN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+from .common import MAC_ADDRESS, MODEL
+
+
+async def test_entities_share_device_metadata(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test all entities of a spa share a single device info."""
+    entities = [
+        entity
+        for platform in async_get_platforms(hass, DOMAIN)
+        for entity in platform.entities.values()
+    ]
+    assert len(entities) > 1
+
+    device_info = entities[0].device_info
+    assert device_info is not None
+    assert device_info["identifiers"] == {(DOMAIN, MAC_ADDRESS)}
+    assert all(entity.device_info is device_info for entity in entities)
+
+    unique_ids = {entity.unique_id for entity in entities}
+    assert len(unique_ids) == len(entities)
+    assert all(
+        unique_id.startswith(f"{MAC_ADDRESS}-{MODEL}") for unique_id in unique_ids
+    )
@@ -0,0 +1,100 @@
+"""Tests for the Balboa Spa Client setup."""
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.balboa.const import DATA_SETUP_TASKS, DOMAIN
+from custom_components.balboa.snapshot import BalboaSpaClient
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import (
+    ATTR_ASSUMED_STATE,
+    CONF_HOST,
+    STATE_OFF,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import HomeAssistant
+
+from .common import MAC_ADDRESS, SpaModule
+
+CLIMATE_ENTITY_ID = "climate.bfbp20"
+PUMP_ENTITY_ID = "fan.bfbp20_pump_1"
+
+
+async def test_entities_set_up_from_snapshot(
+    hass: HomeAssistant, spa_module: SpaModule
+) -> None:
+    """Test the entities of an unreachable spa are set up from its snapshot."""
+    port = spa_module.port
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_HOST: "127.0.0.1"}, unique_id=MAC_ADDRESS
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.balboa.BalboaSpaClient",
+        partial(BalboaSpaClient, port=port),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        entity_ids = hass.states.async_entity_ids()
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        await spa_module.close()
+
+        with patch("custom_components.balboa.SETUP_CONNECT_BUDGET", 0):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert entry.state is ConfigEntryState.LOADED
+        assert entry.entry_id in hass.data[DATA_SETUP_TASKS]
+        assert hass.states.async_entity_ids() == entity_ids
+        climate = hass.states.get(CLIMATE_ENTITY_ID)
+        assert climate.state == "heat"
+        assert climate.attributes[ATTR_ASSUMED_STATE]
+        pump = hass.states.get(PUMP_ENTITY_ID)
+        assert pump.state == STATE_OFF
+        assert pump.attributes[ATTR_ASSUMED_STATE]
+
+        # the spa is attached to the existing entities once it is back
+        await spa_module.start(port)
+        async with asyncio.timeout(5):
+            while hass.states.get(CLIMATE_ENTITY_ID).attributes.get(ATTR_ASSUMED_STATE):
+                await asyncio.sleep(0.05)
+        assert entry.entry_id not in hass.data[DATA_SETUP_TASKS]
+        assert hass.states.async_entity_ids() == entity_ids
+        assert not hass.states.get(PUMP_ENTITY_ID).attributes.get(ATTR_ASSUMED_STATE)
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_attach_failure(
+    hass: HomeAssistant, spa_module: SpaModule, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test a failure to attach the spa within the budget makes setup retry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_HOST: "127.0.0.1"}, unique_id=MAC_ADDRESS
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.balboa.BalboaSpaClient",
+        partial(BalboaSpaClient, port=spa_module.port),
+    ), patch(
+        "custom_components.balboa.async_setup_time_sync",
+        side_effect=OSError("Broken pipe"),
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    assert "Failed to set up spa at 127.0.0.1: Broken pipe" in caplog.text
+    assert hass.states.get(CLIMATE_ENTITY_ID).state == STATE_UNAVAILABLE
+    assert entry.entry_id not in hass.data[DOMAIN]
+    async with asyncio.timeout(5):
+        while spa_module.client_count:
+            await asyncio.sleep(0.01)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
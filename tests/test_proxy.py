@@ -0,0 +1,146 @@
+"""Tests for the Balboa spa proxy."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from functools import partial
+import socket
+from unittest.mock import patch
+
+from pybalboa.enums import MessageType
+from pybalboa.utils import read_one_message
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.balboa.const import CONF_PROXY_PORT, DOMAIN
+from custom_components.balboa.proxy import SpaProxy
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .common import MAC_ADDRESS, SpaModule, build_message, status_update
+
+TOGGLE_PUMP_1 = build_message(MessageType.TOGGLE_STATE, bytes((0x04, 0x00)))
+TOGGLE_LIGHT_1 = build_message(MessageType.TOGGLE_STATE, bytes((0x11, 0x00)))
+
+
+async def _wait_for(predicate: Callable[[], bool]) -> None:
+    """Wait until a condition is met."""
+    async with asyncio.timeout(5):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def proxy(spa_module: SpaModule) -> AsyncGenerator[SpaProxy, None]:
+    """Return a proxy connected to the stand-in module."""
+    proxy = SpaProxy("127.0.0.1", spa_module.port, "127.0.0.1", 0)
+    await proxy.start()
+    assert await proxy.async_connected()
+    yield proxy
+    await proxy.close()
+
+
+@pytest.fixture
+async def clients(
+    proxy: SpaProxy,
+) -> AsyncGenerator[list[tuple[asyncio.StreamReader, asyncio.StreamWriter]], None]:
+    """Return two clients connected to the proxy."""
+    clients = [await asyncio.open_connection("127.0.0.1", proxy.port) for _ in range(2)]
+    await _wait_for(lambda: proxy.client_count == 2)
+    yield clients
+    for _, writer in clients:
+        writer.close()
+
+
+async def test_fan_out(
+    spa_module: SpaModule,
+    clients: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]],
+) -> None:
+    """Test every message from the module reaches every client."""
+    messages = [status_update(temperature=98), status_update(temperature=99)]
+    for message in messages:
+        await spa_module.broadcast(message)
+
+    for reader, _ in clients:
+        for message in messages:
+            assert await read_one_message(reader, 5) == message[1:-1]
+
+
+async def test_client_messages_forwarded_whole(
+    spa_module: SpaModule,
+    clients: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]],
+) -> None:
+    """Test client messages reach the module whole, one per client write."""
+    (_, first), (_, second) = clients
+    received = len(spa_module.received)
+
+    first.write(TOGGLE_PUMP_1[:4])
+    await first.drain()
+    second.write(TOGGLE_LIGHT_1[:3])
+    await second.drain()
+    await asyncio.sleep(0.05)
+    first.write(TOGGLE_PUMP_1[4:])
+    second.write(TOGGLE_LIGHT_1[3:])
+    await _wait_for(lambda: len(spa_module.received) == received + 2)
+
+    assert sorted(spa_module.received[received:]) == sorted(
+        (TOGGLE_PUMP_1[1:-1], TOGGLE_LIGHT_1[1:-1])
+    )
+
+
+async def test_clients_dropped_when_upstream_down(
+    spa_module: SpaModule,
+    proxy: SpaProxy,
+    clients: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]],
+) -> None:
+    """Test clients are disconnected when the module goes away."""
+    await spa_module.close()
+
+    for reader, _ in clients:
+        async with asyncio.timeout(5):
+            assert await reader.read() == b""
+    assert proxy.client_count == 0
+    assert not proxy.connected
+
+
+async def test_close(
+    proxy: SpaProxy,
+    clients: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]],
+) -> None:
+    """Test closing the proxy disconnects clients and ends their handlers."""
+    await proxy.close()
+
+    for reader, _ in clients:
+        async with asyncio.timeout(5):
+            assert await reader.read() == b""
+    assert proxy.client_count == 0
+    assert not proxy.connected
+
+
+async def test_setup_through_proxy(hass: HomeAssistant, spa_module: SpaModule) -> None:
+    """Test a spa is set up through the proxy and the proxy closes on unload."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        proxy_port = sock.getsockname()[1]
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "127.0.0.1"},
+        options={CONF_PROXY_PORT: proxy_port},
+        unique_id=MAC_ADDRESS,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.balboa.SpaProxy", partial(SpaProxy, port=spa_module.port)
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("climate.bfbp20") is not None
+    assert spa_module.client_count == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    await _wait_for(lambda: spa_module.client_count == 0)
+    with pytest.raises(OSError):
+        await asyncio.open_connection("127.0.0.1", proxy_port)
@@ -0,0 +1,193 @@
+"""Tests for the Balboa spa schedules."""
+from __future__ import annotations
+
+from datetime import datetime, time
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.balboa.schedule import (
+    ScheduleRule,
+    async_get_scheduler,
+    next_transition,
+    previous_transition,
+)
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+TIME_ZONE = "America/Denver"
+EVERY_DAY = tuple(range(7))
+MONDAY_MORNING = ScheduleRule((0,), time(8), "Ready", 38.0)
+MONDAY_NIGHT = ScheduleRule((0,), time(20), "Rest")
+TUESDAY_MORNING = ScheduleRule((1,), time(9), temperature=36.0)
+
+
+def _local(*args: int) -> datetime:
+    """Return a local datetime."""
+    return datetime(*args, tzinfo=dt_util.get_time_zone(TIME_ZONE))
+
+
+@pytest.fixture(autouse=True)
+def time_zone(hass: HomeAssistant) -> None:
+    """Use a time zone with daylight saving time."""
+    hass.config.set_time_zone(TIME_ZONE)
+
+
+@pytest.mark.parametrize(
+    ("after", "expected"),
+    [
+        (_local(2024, 1, 7, 23, 0), _local(2024, 1, 8, 8, 0)),
+        (_local(2024, 1, 8, 7, 59), _local(2024, 1, 8, 8, 0)),
+        (_local(2024, 1, 8, 8, 0), _local(2024, 1, 8, 20, 0)),
+        (_local(2024, 1, 8, 20, 0), _local(2024, 1, 15, 8, 0)),
+        (_local(2024, 1, 14, 12, 0), _local(2024, 1, 15, 8, 0)),
+    ],
+)
+def test_next_transition(after: datetime, expected: datetime) -> None:
+    """Test the next transition is strictly after a moment, wrapping the week."""
+    transition = next_transition([MONDAY_NIGHT, MONDAY_MORNING], after)
+
+    assert transition is not None
+    assert transition[0] == expected
+    assert transition[1] is (MONDAY_MORNING if expected.hour == 8 else MONDAY_NIGHT)
+
+
+@pytest.mark.parametrize(
+    ("before", "expected"),
+    [
+        (_local(2024, 1, 8, 7, 59), _local(2024, 1, 1, 20, 0)),
+        (_local(2024, 1, 8, 8, 0), _local(2024, 1, 8, 8, 0)),
+        (_local(2024, 1, 9, 0, 0), _local(2024, 1, 8, 20, 0)),
+        (_local(2024, 1, 14, 23, 59), _local(2024, 1, 8, 20, 0)),
+    ],
+)
+def test_previous_transition(before: datetime, expected: datetime) -> None:
+    """Test the previous transition is at or before a moment, wrapping the week."""
+    transition = previous_transition([MONDAY_MORNING, MONDAY_NIGHT], before)
+
+    assert transition is not None
+    assert transition[0] == expected
+
+
+def test_no_transitions() -> None:
+    """Test there are no transitions without rules."""
+    now = dt_util.utcnow()
+    assert next_transition([], now) is None
+    assert previous_transition([], now) is None
+    assert next_transition([ScheduleRule((), time(8))], now) is None
+
+
+def test_transition_in_skipped_hour() -> None:
+    """Test a transition in the hour skipped by DST happens an hour later."""
+    rule = ScheduleRule(EVERY_DAY, time(2, 30), "Ready")
+
+    transition = next_transition([rule], dt_util.as_utc(_local(2024, 3, 10, 0, 0)))
+
+    assert transition is not None
+    assert dt_util.as_utc(transition[0]) == datetime(
+        2024, 3, 10, 9, 30, tzinfo=dt_util.UTC
+    )
+
+
+def test_transition_in_repeated_hour() -> None:
+    """Test a transition in the hour repeated by DST happens once."""
+    rule = ScheduleRule(EVERY_DAY, time(1, 30), "Ready")
+
+    first = next_transition([rule], dt_util.as_utc(_local(2024, 11, 3, 0, 0)))
+    assert first is not None
+    assert dt_util.as_utc(first[0]) == datetime(2024, 11, 3, 7, 30, tzinfo=dt_util.UTC)
+
+    second = next_transition([rule], dt_util.as_utc(first[0]))
+    assert second is not None
+    assert dt_util.as_utc(second[0]) == datetime(2024, 11, 4, 8, 30, tzinfo=dt_util.UTC)
+
+
+async def _async_move_to(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, moment: datetime
+) -> None:
+    """Move the time to a moment and run the timers that are due."""
+    freezer.move_to(moment)
+    async_fire_time_changed(hass, dt_util.as_utc(moment))
+    await hass.async_block_till_done()
+
+
+async def test_timer_fires_and_rearms(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test due transitions are applied and the next ones are armed."""
+    freezer.move_to(_local(2024, 1, 8, 7, 0))
+    scheduler = await async_get_scheduler(hass)
+    applied: list[tuple[str, ScheduleRule]] = []
+
+    def _applier(entry_id: str):
+        async def _apply(rule: ScheduleRule) -> None:
+            applied.append((entry_id, rule))
+
+        return _apply
+
+    scheduler.async_set_rules("spa_1", [MONDAY_MORNING, MONDAY_NIGHT])
+    scheduler.async_set_rules("spa_2", [TUESDAY_MORNING])
+    detach_1 = scheduler.async_attach("spa_1", _applier("spa_1"))
+    detach_2 = scheduler.async_attach("spa_2", _applier("spa_2"))
+    assert applied == []
+
+    await _async_move_to(hass, freezer, _local(2024, 1, 8, 8, 0))
+    assert applied == [("spa_1", MONDAY_MORNING)]
+
+    await _async_move_to(hass, freezer, _local(2024, 1, 8, 20, 0))
+    await _async_move_to(hass, freezer, _local(2024, 1, 9, 9, 0))
+    assert applied[1:] == [("spa_1", MONDAY_NIGHT), ("spa_2", TUESDAY_MORNING)]
+
+    detach_2()
+    await _async_move_to(hass, freezer, _local(2024, 1, 15, 8, 0))
+    assert applied[3:] == [("spa_1", MONDAY_MORNING)]
+
+    # a transition that was due while the timer was late is still applied
+    await _async_move_to(hass, freezer, _local(2024, 1, 16, 9, 0))
+    assert applied[4:] == [("spa_1", MONDAY_NIGHT)]
+
+    detach_1()
+    await _async_move_to(hass, freezer, _local(2024, 1, 22, 8, 0))
+    assert len(applied) == 5
+
+
+async def test_catch_up_missed_transition(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a transition missed while detached is applied once on attach."""
+    freezer.move_to(_local(2024, 1, 8, 7, 0))
+    scheduler = await async_get_scheduler(hass)
+    applied: list[ScheduleRule] = []
+
+    async def _apply(rule: ScheduleRule) -> None:
+        applied.append(rule)
+
+    scheduler.async_set_rules("spa", [MONDAY_MORNING, MONDAY_NIGHT])
+    await _async_move_to(hass, freezer, _local(2024, 1, 8, 9, 0))
+    assert applied == []
+
+    scheduler.async_attach("spa", _apply)()
+    await hass.async_block_till_done()
+    assert applied == [MONDAY_MORNING]
+
+    scheduler.async_attach("spa", _apply)()
+    await hass.async_block_till_done()
+    assert applied == [MONDAY_MORNING]
+
+
+async def test_no_catch_up_before_rules_were_set(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a transition before the rules were set is not applied."""
+    freezer.move_to(_local(2024, 1, 8, 9, 0))
+    scheduler = await async_get_scheduler(hass)
+    applied: list[ScheduleRule] = []
+
+    async def _apply(rule: ScheduleRule) -> None:
+        applied.append(rule)
+
+    scheduler.async_set_rules("spa", [MONDAY_MORNING])
+    scheduler.async_attach("spa", _apply)()
+    await hass.async_block_till_done()
+    assert applied == []
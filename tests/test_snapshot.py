@@ -0,0 +1,89 @@
+"""Tests for the Balboa spa snapshots."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import Any
+
+from pybalboa.enums import MessageType, SettingsCode
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.balboa.const import DOMAIN
+from custom_components.balboa.snapshot import (
+    SAVE_DELAY,
+    STORAGE_KEY,
+    BalboaSpaClient,
+    async_get_snapshot_store,
+)
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+from .common import MAC_ADDRESS, MODEL, SpaModule, status_update
+
+
+async def test_snapshot_saved(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    config_entry: MockConfigEntry,
+    spa_module: SpaModule,
+) -> None:
+    """Test the snapshot of a spa in use is saved with its latest status."""
+    spa: BalboaSpaClient = hass.data[DOMAIN][config_entry.entry_id]
+    spa_module.status = status_update(temperature=98, pumps=0x02)
+    await spa_module.broadcast(spa_module.status)
+    async with asyncio.timeout(5):
+        while spa.temperature != 98:
+            await asyncio.sleep(0.01)
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SAVE_DELAY))
+    await hass.async_block_till_done()
+
+    messages = hass_storage[STORAGE_KEY]["data"][config_entry.entry_id]["messages"]
+    assert len(messages) == 6
+    assert spa_module.status[1:-1].hex() in messages
+
+    snapshots = await async_get_snapshot_store(hass)
+    await hass.config_entries.async_remove(config_entry.entry_id)
+    assert snapshots.get(config_entry.entry_id) == []
+
+
+async def test_restore(
+    hass: HomeAssistant, config_entry: MockConfigEntry, spa_module: SpaModule
+) -> None:
+    """Test a restored client describes the spa but is not loaded."""
+    snapshots = await async_get_snapshot_store(hass)
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    snapshot = snapshots.get(config_entry.entry_id)
+
+    spa = BalboaSpaClient("127.0.0.1", spa_module.port)
+    spa.restore(snapshot)
+
+    assert spa.snapshot_complete
+    assert spa.mac_address == MAC_ADDRESS
+    assert spa.model == MODEL
+    assert spa.temperature == 100
+    assert [pump.state for pump in spa.pumps] == [0, 0]
+    assert not spa.configuration_loaded
+    assert not spa.available
+    assert spa.last_message_received is None
+
+    received = len(spa_module.received)
+    try:
+        assert await spa.connect()
+        assert await spa.async_configuration_loaded()
+    finally:
+        await spa.disconnect()
+    # the same live status loads it, and its configuration is requested again
+    requests = {
+        (data[3], data[4] if data[3] == MessageType.REQUEST else None)
+        for data in spa_module.received[received:]
+    }
+    assert requests >= {
+        (MessageType.REQUEST, SettingsCode.SYSTEM_INFORMATION),
+        (MessageType.REQUEST, SettingsCode.SETUP_PARAMETERS),
+        (MessageType.REQUEST, SettingsCode.DEVICE_CONFIGURATION),
+        (MessageType.REQUEST, SettingsCode.FILTER_CYCLE),
+    }
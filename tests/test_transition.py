@@ -0,0 +1,108 @@
+"""Tests for the Balboa transition events."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from functools import partial
+
+from pybalboa.enums import HeatState, MessageType, SettingsCode, UnknownState
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.balboa.const import DOMAIN, EVENT_TRANSITION
+from custom_components.balboa.snapshot import BalboaSpaClient
+from custom_components.balboa.transition import FAULT_LOG_INTERVAL
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+import homeassistant.util.dt as dt_util
+
+from .common import MAC_ADDRESS, SpaModule, fault_log, status_update
+
+
+async def _wait_for(hass: HomeAssistant, predicate: Callable[[], bool]) -> None:
+    """Wait until a condition is met and its events have been handled."""
+    async with asyncio.timeout(5):
+        while not predicate():
+            await asyncio.sleep(0.01)
+    await hass.async_block_till_done()
+
+
+async def test_one_event_per_change(
+    hass: HomeAssistant, config_entry: MockConfigEntry, spa_module: SpaModule
+) -> None:
+    """Test each change in a status fires one event, and nothing else does."""
+    spa: BalboaSpaClient = hass.data[DOMAIN][config_entry.entry_id]
+    device = dr.async_get(hass).async_get_device({(DOMAIN, MAC_ADDRESS)})
+    events = async_capture_events(hass, EVENT_TRANSITION)
+
+    await spa_module.broadcast(status_update(heat_state=1, pumps=0x02))
+    await _wait_for(hass, lambda: spa.heat_state == HeatState.HEATING)
+    assert sorted((event.data for event in events), key=lambda data: data["type"]) == [
+        {
+            "device_id": device.id,
+            "type": "heat_state_heating",
+            "from": "off",
+            "to": "heating",
+        },
+        {
+            "device_id": device.id,
+            "type": "turned_high",
+            "subtype": "Pump 1",
+            "from": "off",
+            "to": "high",
+        },
+    ]
+
+    events.clear()
+    await spa_module.broadcast(status_update(heat_state=1, pumps=0x02))
+    await spa_module.broadcast(status_update(heat_state=1, pumps=0x02, minute=1))
+    await _wait_for(hass, lambda: spa.time_minute == 1)
+    assert not events
+
+
+async def test_no_event_to_or_from_unknown(
+    hass: HomeAssistant, config_entry: MockConfigEntry, spa_module: SpaModule
+) -> None:
+    """Test changes to or from an unknown state do not fire."""
+    spa: BalboaSpaClient = hass.data[DOMAIN][config_entry.entry_id]
+    events = async_capture_events(hass, EVENT_TRANSITION)
+
+    spa.pumps[0].update(-1)
+    await hass.async_block_till_done()
+    assert spa.pumps[0].state == UnknownState.UNKNOWN
+
+    await spa_module.broadcast(status_update(pumps=0x02))
+    await _wait_for(hass, lambda: spa.pumps[0].state == 2)
+    assert not events
+
+
+async def test_fault_event(
+    hass: HomeAssistant, config_entry: MockConfigEntry, spa_module: SpaModule
+) -> None:
+    """Test a new fault log entry fires one event with its code, once."""
+    spa: BalboaSpaClient = hass.data[DOMAIN][config_entry.entry_id]
+    device = dr.async_get(hass).async_get_device({(DOMAIN, MAC_ADDRESS)})
+    await _wait_for(hass, lambda: spa.fault_log is not None)
+    events = async_capture_events(hass, EVENT_TRANSITION)
+
+    spa_module.responses[(MessageType.REQUEST, SettingsCode.FAULT_LOG)] = partial(
+        fault_log, count=2, entry_number=1, message_code=21
+    )
+    now = dt_util.utcnow()
+    for intervals in (1, 2):
+        previous = spa.fault_log
+        async_fire_time_changed(hass, now + FAULT_LOG_INTERVAL * intervals)
+        await _wait_for(hass, lambda: spa.fault_log is not previous)
+
+    assert [event.data for event in events] == [
+        {"device_id": device.id, "type": "fault", "code": 21}
+    ]
+
+    # the entry present when tracking starts does not fire
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    spa = hass.data[DOMAIN][config_entry.entry_id]
+    await _wait_for(hass, lambda: spa.fault_log is not None)
+    assert len(events) == 1
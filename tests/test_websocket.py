@@ -0,0 +1,93 @@
+"""Tests for the Balboa spa telemetry websocket command."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from custom_components.balboa.const import DATA_SUBSCRIPTIONS, DOMAIN
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+import homeassistant.util.dt as dt_util
+
+from .common import SpaModule, status_update
+
+
+async def _async_set_temperature(
+    hass: HomeAssistant, spa_module: SpaModule, temperature: int
+) -> None:
+    """Have the stand-in module report a new temperature to its clients."""
+    spa = hass.data[DOMAIN][next(iter(hass.data[DOMAIN]))]
+    spa_module.status = status_update(temperature=temperature)
+    await spa_module.broadcast(spa_module.status)
+    async with asyncio.timeout(5):
+        while spa.temperature != temperature:
+            await asyncio.sleep(0.01)
+    await hass.async_block_till_done()
+
+
+async def test_subscribe(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    config_entry: MockConfigEntry,
+    spa_module: SpaModule,
+) -> None:
+    """Test the telemetry is sent, then changes at most once per interval."""
+    client = await hass_ws_client(hass)
+    await client.send_json(
+        {"id": 1, "type": "balboa/subscribe", "entry_id": config_entry.entry_id}
+    )
+    assert (await client.receive_json())["success"]
+    event = (await client.receive_json())["event"]
+    assert event["temperature"] == 100
+    assert event["pumps"] == [0, 0]
+
+    # changes within the interval are merged into one trailing delta
+    await _async_set_temperature(hass, spa_module, 98)
+    await _async_set_temperature(hass, spa_module, 99)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    assert (await client.receive_json())["event"] == {"temperature": 99}
+
+    await client.send_json({"id": 2, "type": "unsubscribe_events", "subscription": 1})
+    assert (await client.receive_json())["success"]
+    assert not hass.data[DATA_SUBSCRIPTIONS]
+
+
+async def test_subscribe_follows_reload(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    config_entry: MockConfigEntry,
+    spa_module: SpaModule,
+) -> None:
+    """Test a subscription keeps sending changes after the entry is reloaded."""
+    client = await hass_ws_client(hass)
+    await client.send_json(
+        {"id": 1, "type": "balboa/subscribe", "entry_id": config_entry.entry_id}
+    )
+    assert (await client.receive_json())["success"]
+    assert (await client.receive_json())["event"]["temperature"] == 100
+
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert spa_module.client_count == 1
+
+    await _async_set_temperature(hass, spa_module, 97)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    assert (await client.receive_json())["event"] == {"temperature": 97}
+
+
+async def test_subscribe_unknown_entry(
+    hass: HomeAssistant, hass_ws_client: WebSocketGenerator
+) -> None:
+    """Test subscribing to an unknown entry fails."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 1, "type": "balboa/subscribe", "entry_id": "nope"})
+    msg = await client.receive_json()
+    assert not msg["success"]
+    assert msg["error"]["code"] == "not_found"